@@ -29,6 +29,7 @@ import threading
 import uuid
 import queue
 import time
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
 
 import requests
@@ -38,19 +39,37 @@ from PyQt5.QtCore import QDir, Qt
 from PyQt5 import QtCore, QtGui, QtWidgets, uic
 
 try:
-    from fdlogger.lib.lookup import HamDBlookup, HamQTH, QRZlookup
-    from fdlogger.lib.cat_interface import CAT
+    from fdlogger.lib.lookup import HamDBlookup, HamQTH, LocalDBlookup, QRZlookup
+    from fdlogger.lib.callbook_cache import CachedLookup, CallbookCache
+    from fdlogger.lib.call_history import CallHistory
+    from fdlogger.lib.circuit_breaker import CircuitBreaker
+    from fdlogger.lib.http_client import http_session
+    from fdlogger.lib.lookup_service import LookupService
+    from fdlogger.lib.session_store import SessionStore
+    from fdlogger.lib.cat_manager import CATManager
     from fdlogger.lib.settings import Settings
     from fdlogger.lib.database import DataBase
+    from fdlogger.lib.dupe_index import DupeIndex
+    from fdlogger.lib.log_model import ContactLogModel
+    from fdlogger.lib.super_check import SuperCheck
     from fdlogger.lib.cwinterface import CW
     from fdlogger.lib.n1mm import N1MM
     from fdlogger.lib.edit_opon import OpOn
     from fdlogger.lib.version import __version__
 except ModuleNotFoundError:
-    from lib.lookup import HamDBlookup, HamQTH, QRZlookup
-    from lib.cat_interface import CAT
+    from lib.lookup import HamDBlookup, HamQTH, LocalDBlookup, QRZlookup
+    from lib.callbook_cache import CachedLookup, CallbookCache
+    from lib.call_history import CallHistory
+    from lib.circuit_breaker import CircuitBreaker
+    from lib.http_client import http_session
+    from lib.lookup_service import LookupService
+    from lib.session_store import SessionStore
+    from lib.cat_manager import CATManager
     from lib.settings import Settings
     from lib.database import DataBase
+    from lib.dupe_index import DupeIndex
+    from lib.log_model import ContactLogModel
+    from lib.super_check import SuperCheck
     from lib.cwinterface import CW
     from lib.n1mm import N1MM
     from lib.edit_opon import OpOn
@@ -74,12 +93,19 @@ class QsoEdit(QtCore.QObject):
     """
 
     lineChanged = QtCore.pyqtSignal()
+    contactChanged = QtCore.pyqtSignal(int)
+    contactDeleted = QtCore.pyqtSignal(int)
 
 
 class MainWindow(QtWidgets.QMainWindow):
     """Main Window"""
 
+    superCheckReady = QtCore.pyqtSignal(int, str, list, list)
+    cloudlogChecked = QtCore.pyqtSignal(int, bool, str)
     database = "FieldDay.db"
+    callbook_cache = "callbook_cache.db"
+    call_history = "call_history.db"
+    callbook_session = "callbook_session.json"
     power = "100"
     band = "40"
     mode = "CW"
@@ -93,9 +119,10 @@ class MainWindow(QtWidgets.QMainWindow):
     secPartial = {}
     secName = {}
     secState = {}
-    scp = []
     wrkdsections = []
-    linetopass = ""
+    scp_limit = 100
+    nplusone_limit = 20
+    keystroke_debounce = 100
     bands = ("160", "80", "60", "40", "20", "15", "10", "6", "2")
     cloudlogauthenticated = False
     qrzsession = False
@@ -109,7 +136,6 @@ class MainWindow(QtWidgets.QMainWindow):
     basescore = 0
     powermult = 0
     datadict = {}
-    dupdict = {}
     ft8dupe = ""
     fkeys = {}
     people = {}
@@ -135,8 +161,35 @@ class MainWindow(QtWidgets.QMainWindow):
         self.group_call_indicator.hide()
         self.mycallEntry.show()
         self.db = DataBase(self.database)
+        self.callbook = CallbookCache(self.callbook_cache)
+        self.lookup_service = LookupService(parent=self)
+        self.lookup_service.lookupDone.connect(self.lookup_done)
+        self.pending_enrichment = {}
+        self.sessions = SessionStore(self.callbook_session)
+        self.callbook_provider = None
+        self.connect_worker = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="connect"
+        )
+        self.cloudlog_generation = 0
+        self.cloudlogChecked.connect(self.cloudlog_checked)
+        self.scp = SuperCheck()
+        self.supercheck_generation = 0
+        self.supercheck_future = None
+        self.supercheck_worker = ThreadPoolExecutor(max_workers=1)
+        self.supercheck_timer = QtCore.QTimer()
+        self.supercheck_timer.setSingleShot(True)
+        self.supercheck_timer.setInterval(self.keystroke_debounce)
+        self.supercheck_timer.timeout.connect(self.start_super_check)
+        self.superCheckReady.connect(self.show_super_check)
+        self.dupe_index = DupeIndex()
+        self.dupe_index.load(self.db.fetch_all_dupe_rows())
+        self.history = CallHistory(self.call_history)
+        self.history.load()
+        self.prefilled = ("", "")
         self.udp_fifo = queue.Queue()
-        self.listWidget.itemDoubleClicked.connect(self.qsoclicked)
+        self.log_model = ContactLogModel(self.db, self)
+        self.log_view.setModel(self.log_model)
+        self.log_view.doubleClicked.connect(self.qsoclicked)
         self.callsign_entry.textEdited.connect(self.calltest)
         self.class_entry.textEdited.connect(self.classtest)
         self.section_entry.textEdited.connect(self.sectiontest)
@@ -212,6 +265,8 @@ class MainWindow(QtWidgets.QMainWindow):
             "usehamdb": 0,
             "useqrz": 0,
             "usehamqth": 0,
+            "uselocaldb": 0,
+            "localdb": "callsigns.db",
             "lookupusername": "w1aw",
             "lookuppassword": "secret",
             "userigctld": 0,
@@ -239,6 +294,8 @@ class MainWindow(QtWidgets.QMainWindow):
             "n1mm_contactport": 12061,
             "n1mm_lookupport": 12060,
             "n1mm_scoreport": 12062,
+            "usetallies": 0,
+            "radios": [],
         }
         self.reference_preference = self.preference.copy()
         self.look_up = None
@@ -256,6 +313,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.ft8dupechecktimer = QtCore.QTimer()
         self.ft8dupechecktimer.timeout.connect(self.ft8dupecheck)
         self.ft8dupechecktimer.start(1000)
+        self.callbook_state = None
+        self.callbookchecktimer = QtCore.QTimer()
+        self.callbookchecktimer.timeout.connect(self.check_callbook_state)
+        self.callbookchecktimer.start(1000)
 
         # ft8 udp server
         self.udp_socket = QUdpSocket()
@@ -598,30 +659,50 @@ class MainWindow(QtWidgets.QMainWindow):
         self.contactlookup["bearing"] = ""
 
     def lazy_lookup(self, acall: str):
-        """El Lookup De Lazy"""
+        """El Lookup De Lazy, queues a callbook lookup of the contact."""
         if self.look_up:
+            acall = acall.upper()
             if acall == self.contactlookup["call"]:
                 return
-
+            if (
+                self.contactlookup["call"]
+                and self.contactlookup["call"] not in self.pending_enrichment
+            ):
+                self.lookup_service.cancel(self.contactlookup["call"])
+            self.clearcontactlookup()
             self.contactlookup["call"] = acall
-            (
-                self.contactlookup["grid"],
-                self.contactlookup["name"],
-                self.contactlookup["nickname"],
-                self.contactlookup["error"],
-            ) = self.look_up.lookup(acall)
-            if self.contactlookup["grid"] and self.mygrid:
-                self.contactlookup["distance"] = self.distance(
-                    self.mygrid, self.contactlookup["grid"]
-                )
-                self.contactlookup["bearing"] = self.bearing(
-                    self.mygrid, self.contactlookup["grid"]
-                )
-            logger.info("%s", self.contactlookup)
-            self.infoline.setText(
-                f"{self.contactlookup.get('nickname') if self.contactlookup.get('nickname') else self.contactlookup.get('name')}"
-                f" {self.contactlookup.get('grid')}"
+            self.lookup_service.lookup(acall, self.look_up)
+
+    def lookup_done(self, acall: str, result: tuple):
+        """Takes a finished callbook lookup from the lookup service."""
+        for contact_id in self.pending_enrichment.pop(acall, ()):
+            if result[0] or result[1]:
+                self.db.change_contact_lookup(contact_id, result[0], result[1])
+                self.log_model.refresh_contact(contact_id)
+            self.postcloudlog(contact_id)
+        if acall == self.preference.get("mycall", "").upper():
+            self.mygrid = result[0]
+            logger.info("my grid: %s", self.mygrid)
+        if acall != self.contactlookup["call"]:
+            return
+        (
+            self.contactlookup["grid"],
+            self.contactlookup["name"],
+            self.contactlookup["nickname"],
+            self.contactlookup["error"],
+        ) = result
+        if self.contactlookup["grid"] and self.mygrid:
+            self.contactlookup["distance"] = self.distance(
+                self.mygrid, self.contactlookup["grid"]
             )
+            self.contactlookup["bearing"] = self.bearing(
+                self.mygrid, self.contactlookup["grid"]
+            )
+        logger.info("%s", self.contactlookup)
+        self.infoline.setText(
+            f"{self.contactlookup.get('nickname') if self.contactlookup.get('nickname') else self.contactlookup.get('name')}"
+            f" {self.contactlookup.get('grid')}"
+        )
 
     def distance(self, grid1: str, grid2: str) -> float:
         """
@@ -747,7 +828,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 dxcall,
             )
 
-            if f"{dxcall}{self.band}{self.mode}" in self.dupdict:
+            if self.dupe_index.is_dupe(dxcall, self.band, self.mode):
                 self.ft8dupe = f"{dxcall} {self.band}M {self.mode} FT8 Dupe!"
             return
 
@@ -776,41 +857,52 @@ class MainWindow(QtWidgets.QMainWindow):
         contest_id = self.getvalue("CONTEST_ID")
         if contest_id == "ARRL-FIELD-DAY":
             call = self.getvalue("CALL")
-            dayt = self.getvalue("QSO_DATE")
-            tyme = self.getvalue("TIME_ON")
-            the_dt = f"{dayt[0:4]}-{dayt[4:6]}-{dayt[6:8]} {tyme[0:2]}:{tyme[2:4]}:{tyme[4:6]}"
             freq = int(float(self.getvalue("FREQ")) * 1000000)
             band = self.getvalue("BAND").split("M")[0]
             grid = self.getvalue("GRIDSQUARE")
             name = self.getvalue("NAME")
-            if grid == "NOT_FOUND" or name == "NOT_FOUND":
-                if grid == "NOT_FOUND":
-                    grid = ""
-                if name == "NOT_FOUND":
-                    name = ""
-                if self.look_up:
-                    grid, name, _, _ = self.look_up.lookup(call)
+            enrich = self.look_up and (grid == "NOT_FOUND" or name == "NOT_FOUND")
+            if grid == "NOT_FOUND":
+                grid = ""
+            if name == "NOT_FOUND":
+                name = ""
             hisclass, hissect = self.getvalue("SRX_STRING").split(" ")
             # power = int(float(self.getvalue("TX_PWR")))
             contact = (
                 call,
                 hisclass,
                 hissect,
-                the_dt,
                 freq,
                 band,
                 "DI",
                 self.preference["power"],
                 grid,
                 name,
+                uuid.uuid4().hex,
             )
-            self.db.log_contact(contact)
+            contact_id = self.db.log_contact(contact)
+            if contact_id is None:
+                return
+            self.dupe_index.add((call, hisclass, hissect, band, "DI"))
+            self.scp.add_calls((call,))
             self.sections()
             self.stats()
             self.updatemarker()
-            self.logwindow()
+            self.log_model.insert_contact(contact_id)
             self.clearinputs()
-            self.postcloudlog()
+            if enrich:
+                self.enrich_contact(contact_id, call)
+            else:
+                self.postcloudlog(contact_id)
+
+    def enrich_contact(self, contact_id: int, call: str):
+        """
+        Queues a callbook lookup for a contact logged without a grid or name.
+        lookup_done fills them in, then posts the contact to Cloudlog.
+        """
+        call = call.upper()
+        self.pending_enrichment.setdefault(call, []).append(contact_id)
+        self.lookup_service.lookup(call, self.look_up)
 
     def ft8dupecheck(self):
         """Dup Check"""
@@ -904,47 +996,61 @@ class MainWindow(QtWidgets.QMainWindow):
         macro = macro.replace("{HISCALL}", self.callsign_entry.text())
         return macro
 
+    def guard_lookup(self, provider):
+        """
+        Wraps a callbook provider in a circuit breaker, so a dead network fails
+        fast, and the on disk cache, so repeat calls never touch the network.
+        """
+        return CachedLookup(CircuitBreaker(provider), self.callbook)
+
+    def connect_callbook(self, provider):
+        """
+        Gives a QRZ or HamQTH provider the session key saved from the last
+        run, or logs it in on a worker thread, and returns it guarded.
+        Until it has a session its icon stays grey and lookups come back empty.
+        """
+        self.callbook_provider = provider
+        if not self.sessions.restore(provider):
+            self.connect_worker.submit(provider.getsession)
+        return self.guard_lookup(provider)
+
+    def check_callbook_state(self):
+        """
+        Shows the callbook red while its circuit breaker has it offline and
+        grey until it has a session. Saves new session keys, and looks up our
+        own grid once there is a session to do it with.
+        """
+        if not self.look_up:
+            return
+        if self.callbook_provider:
+            self.sessions.save(self.callbook_provider)
+        if not self.look_up.online:
+            state = "color: rgb(204, 0, 0);"
+        elif getattr(self.look_up, "session", True):
+            state = "color: rgb(128, 128, 0);"
+        else:
+            state = "color: rgb(136, 138, 133);"
+        if state != self.callbook_state:
+            if (
+                state == "color: rgb(128, 128, 0);"
+                and not self.mygrid
+                and self.preference.get("mycall")
+            ):
+                self.lookupmygrid()
+            self.callbook_state = state
+            self.callbook_icon.setStyleSheet(state)
+
     def settings_pressed(self):
         """Do this after Settings icon clicked."""
         settingsdialog = Settings(self)
         settingsdialog.exec()
         self.infobox.clear()
+        if self.look_up:
+            self.look_up.close()
         self.look_up = None
-        self.cat_control = None
+        self.callbook_provider = None
+        self.callbook_state = None
         self.readpreferences()
-        if self.preference["useqrz"]:
-            self.look_up = QRZlookup(
-                self.preference["lookupusername"], self.preference["lookuppassword"]
-            )
-        if self.preference["usehamdb"]:
-            self.look_up = HamDBlookup()
-        if self.preference["usehamqth"]:
-            self.look_up = HamQTH(
-                self.preference["lookupusername"],
-                self.preference["lookuppassword"],
-            )
-        if self.preference["useflrig"]:
-            self.cat_control = CAT(
-                "flrig", self.preference["CAT_ip"], self.preference["CAT_port"]
-            )
-        if self.preference["userigctld"]:
-            self.cat_control = CAT(
-                "rigctld", self.preference["CAT_ip"], self.preference["CAT_port"]
-            )
-
-        if self.preference["cloudlog"]:
-            cloudlogapi = self.preference["cloudlogapi"]
-            cloudlogurl = self.preference["cloudlogurl"]
-
-            payload = "/validate/key=" + cloudlogapi
-            logger.info("%s", cloudlogurl + payload)
-            try:
-                result = requests.get(cloudlogurl + payload, timeout=2.0)
-                self.cloudlogauthenticated = False
-                if result.status_code == 200 or result.status_code == 400:
-                    self.cloudlogauthenticated = True
-            except requests.exceptions.ConnectionError as exception:
-                logger.warning("cloudlog authentication: %s", exception)
 
     @staticmethod
     def has_internet():
@@ -956,39 +1062,56 @@ class MainWindow(QtWidgets.QMainWindow):
             return False
 
     def cloudlogauth(self):
-        """Check if cloudlog is happy with us."""
+        """Starts checking if cloudlog is happy with us, on a worker thread."""
         self.cloudlog_icon.setPixmap(self.cloud_grey)
         self.cloudlogauthenticated = False
+        self.cloudlog_generation += 1
         if self.preference["cloudlog"]:
-            try:
-                self.cloudlog_icon.setPixmap(self.cloud_red)
-                test = (
-                    self.preference["cloudlogurl"]
-                    + "auth/"
-                    + self.preference["cloudlogapi"]
-                )
-                logger.debug("%s", test)
-                result = requests.get(test, params={}, timeout=2.0)
-                if result.status_code == 200 and result.text.find("<status>") > 0:
-                    if (
-                        result.text[
-                            result.text.find("<status>")
-                            + 8 : result.text.find("</status>")
-                        ]
-                        == "Valid"
-                    ):
-                        self.cloudlogauthenticated = True
-                        self.cloudlog_icon.setPixmap(self.cloud_green)
-                        logger.info("Cloudlog: Authenticated.")
-                else:
-                    logger.warning(
-                        "Cloudlog: %s Unable to authenticate.", result.status_code
-                    )
-            except requests.exceptions.RequestException as exception:
-                self.infobox.insertPlainText(
-                    f"****Cloudlog Auth Error:****\n{exception}\n"
+            self.cloudlog_icon.setPixmap(self.cloud_red)
+            self.connect_worker.submit(
+                self.cloudlog_check,
+                self.cloudlog_generation,
+                self.preference["cloudlogurl"]
+                + "auth/"
+                + self.preference["cloudlogapi"],
+            )
+
+    def cloudlog_check(self, generation: int, test: str):
+        """Asks cloudlog about our api key. Runs off the GUI thread."""
+        authenticated = False
+        error_text = ""
+        logger.debug("%s", test)
+        try:
+            result = http_session().get(test, params={}, timeout=2.0)
+            if result.status_code == 200 and result.text.find("<status>") > 0:
+                if (
+                    result.text[
+                        result.text.find("<status>") + 8 : result.text.find("</status>")
+                    ]
+                    == "Valid"
+                ):
+                    authenticated = True
+            else:
+                logger.warning(
+                    "Cloudlog: %s Unable to authenticate.", result.status_code
                 )
-                logger.warning("Cloudlog: %s", exception)
+        except requests.exceptions.RequestException as exception:
+            logger.warning("Cloudlog: %s", exception)
+            error_text = f"{exception}"
+        self.cloudlogChecked.emit(generation, authenticated, error_text)
+
+    def cloudlog_checked(self, generation: int, authenticated: bool, error_text: str):
+        """Shows the result of the latest cloudlog check."""
+        if generation != self.cloudlog_generation:
+            return
+        self.cloudlogauthenticated = authenticated
+        if authenticated:
+            self.cloudlog_icon.setPixmap(self.cloud_green)
+            logger.info("Cloudlog: Authenticated.")
+        if error_text:
+            self.infobox.insertPlainText(
+                f"****Cloudlog Auth Error:****\n{error_text}\n"
+            )
 
     def set_fakefreq(self, newfreq):
         """doc"""
@@ -1073,39 +1196,109 @@ class MainWindow(QtWidgets.QMainWindow):
         self.mode_selector.setCurrentIndex(self.mode_selector.findText(themode))
         self.changemode()
 
+    def start_cat(self, radios: list):
+        """
+        Starts a CATManager polling each radio in radios, a list of
+        (interface, host, port). The first one gets the focus.
+        """
+        manager = CATManager(parent=self)
+        manager.radioChanged.connect(self.radio_changed)
+        manager.onlineChanged.connect(self.radio_online_changed)
+        manager.focusChanged.connect(self.focus_changed)
+        for interface, host, port in radios:
+            manager.add_radio(interface, host, port)
+        return manager
+
+    def cat_radios(self) -> list:
+        """
+        Returns (interface, host, port) for each radio to poll. The one set
+        up in the settings dialog comes first, then any listed under
+        "radios" in fd_preferences.json.
+        """
+        radios = []
+        if self.preference["userigctld"]:
+            radios.append(
+                ("rigctld", self.preference["CAT_ip"], self.preference["CAT_port"])
+            )
+        elif self.preference["useflrig"]:
+            radios.append(
+                ("flrig", self.preference["CAT_ip"], self.preference["CAT_port"])
+            )
+        for radio in self.preference.get("radios", []):
+            try:
+                radios.append((radio["interface"], radio["host"], int(radio["port"])))
+            except (KeyError, TypeError, ValueError) as exception:
+                logger.warning("cat_radios: skipping %s: %s", radio, exception)
+        return radios
+
+    def show_radio_online(self, online: bool):
+        """Shows whether the focus radio is answering."""
+        self.rigonline = online
+        if online:
+            self.radio_icon.setPixmap(self.radio_green)
+        else:
+            self.radio_icon.setPixmap(self.radio_red)
+
+    def show_radio(self, newfreq: str, newmode: str):
+        """Follows the focus radio's band and mode."""
+        self.oldfreq = newfreq
+        self.set_fakefreq(int(newfreq))
+        self.oldmode = newmode
+        if self.getband(newfreq) == 0:
+            self.setband(str(self.getband(self.oldfreq)))
+        else:
+            self.setband(str(self.getband(newfreq)))
+        self.setmode(str(self.getmode(newmode)))
+
+    def radio_online_changed(self, radio_nr: int, online: bool):
+        """A radio started or stopped answering."""
+        if self.sender() is not self.cat_control:
+            return
+        if radio_nr == self.cat_control.focus:
+            self.show_radio_online(online)
+
+    def radio_changed(self, radio_nr: int, newfreq: str, newmode: str):
+        """A radio was tuned or changed mode."""
+        if self.sender() is not self.cat_control:
+            return
+        if radio_nr == self.cat_control.focus:
+            self.show_radio(newfreq, newmode)
+
+    def focus_changed(self, radio_nr: int):
+        """The focus moved to another radio, follow what it's doing."""
+        if self.sender() is not self.cat_control:
+            return
+        state = self.cat_control.state(radio_nr)
+        self.show_radio_online(state["online"])
+        if state["online"] and state["vfo"]:
+            self.show_radio(state["vfo"], state["mode"])
+        self.infoline.setText(f"Radio {radio_nr}")
+
     def poll_radio(self):
-        """poll radios"""
+        """
+        Sends each radio's state to N1MM. The radios themselves are polled
+        by the CAT manager's workers, this never waits on them.
+        """
         if self.cat_control:
-            newfreq = self.cat_control.get_vfo()
-            newmode = self.cat_control.get_mode()
-            if newfreq == "" or newmode == "":
-                self.radio_icon.setPixmap(self.radio_red)
-                return
-            self.radio_icon.setPixmap(self.radio_green)
-            if newfreq != self.oldfreq or newmode != self.oldmode:
-                self.oldfreq = newfreq
-                self.set_fakefreq(int(newfreq))
-                self.oldmode = newmode
-                if self.getband(newfreq) == 0:
-                    self.setband(str(self.getband(self.oldfreq)))
-                else:
-                    self.setband(str(self.getband(newfreq)))
-                self.setmode(str(self.getmode(newmode)))
-                self.radio_icon.setPixmap(self.radio_green)
             if self.preference.get("send_n1mm_packets"):
-                self.n1mm.radio_info["StationName"] = self.preference.get(
-                    "n1mm_station_name", ""
-                )
-                self.n1mm.radio_info["Freq"] = newfreq[:-1]
-                self.n1mm.radio_info["TXFreq"] = newfreq[:-1]
-                self.n1mm.radio_info["Mode"] = newmode
-                self.n1mm.radio_info["OpCall"] = self.preference.get("mycallsign", "")
-                self.n1mm.radio_info["IsRunning"] = str(self.run_state)
-                if self.cat_control.get_ptt() == "0":
-                    self.n1mm.radio_info["IsTransmitting"] = "False"
-                else:
-                    self.n1mm.radio_info["IsTransmitting"] = "True"
-                self.n1mm.send_radio()
+                for radio_nr, state in self.cat_control.states.items():
+                    if not state["online"]:
+                        continue
+                    self.n1mm.radio_info["StationName"] = self.preference.get(
+                        "n1mm_station_name", ""
+                    )
+                    self.n1mm.radio_info["RadioNr"] = str(radio_nr)
+                    self.n1mm.radio_info["Freq"] = str(state["vfo"])[:-1]
+                    self.n1mm.radio_info["TXFreq"] = str(state["vfo"])[:-1]
+                    self.n1mm.radio_info["Mode"] = state["mode"]
+                    self.n1mm.radio_info["OpCall"] = self.preference.get(
+                        "mycallsign", ""
+                    )
+                    self.n1mm.radio_info["IsRunning"] = str(self.run_state)
+                    self.n1mm.radio_info["IsTransmitting"] = str(state["ptt"])
+                    self.n1mm.radio_info["FocusRadioNr"] = str(self.cat_control.focus)
+                    self.n1mm.radio_info["ActiveRadioNr"] = str(self.cat_control.active)
+                    self.n1mm.send_radio()
         else:
             logger.info("cat_control %s", self.cat_control)
             self.radio_icon.setPixmap(QtGui.QPixmap(self.radio_grey))
@@ -1124,6 +1317,22 @@ class MainWindow(QtWidgets.QMainWindow):
         )
         app.processEvents()
 
+    def closeEvent(self, event):  # pylint: disable=invalid-name
+        """This extends QT's closeEvent, closing the database cleanly on exit."""
+        self.supercheck_timer.stop()
+        self.supercheck_worker.shutdown(wait=False)
+        if self.cat_control:
+            self.cat_control.stop()
+        self.lookup_service.shutdown()
+        self.connect_worker.shutdown(wait=False, cancel_futures=True)
+        if self.callbook_provider:
+            self.sessions.save(self.callbook_provider)
+        if self.look_up:
+            self.look_up.close()
+        self.callbook.close()
+        self.db.close()
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):  # pylint: disable=invalid-name
         """This extends QT's KeyPressEvent, handle tab, esc and function keys"""
         event_key = event.key()
@@ -1136,6 +1345,13 @@ class MainWindow(QtWidgets.QMainWindow):
                     self.cw.sendcw("\x1b4")
                     self.infoline.setText("")
             return
+        if (
+            event_key == Qt.Key_R
+            and event.modifiers() == Qt.ControlModifier
+            and self.cat_control is not None
+        ):
+            self.cat_control.next_focus()
+            return
         if event_key == Qt.Key.Key_PageUp:
             if self.cw is not None:
                 if self.cw.servertype == 1:
@@ -1163,12 +1379,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 return
             if self.callsign_entry.hasFocus():
                 logger.info("From callsign")
-                _thethread = threading.Thread(
-                    target=self.lazy_lookup,
-                    args=(self.callsign_entry.text(),),
-                    daemon=True,
-                )
-                _thethread.start()
+                self.lazy_lookup(self.callsign_entry.text())
                 self.class_entry.setFocus()
                 self.class_entry.deselect()
                 self.class_entry.end(False)
@@ -1364,6 +1575,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.callsign_entry.clear()
         self.class_entry.clear()
         self.section_entry.clear()
+        self.prefilled = ("", "")
         self.callsign_entry.setFocus()
 
     def changeband(self):
@@ -1396,9 +1608,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def lookupmygrid(self):
         """lookup my own gridsquare"""
-        if self.look_up:
-            self.mygrid, _, _, _ = self.look_up.lookup(self.mycallEntry.text())
-            logger.info("my grid: %s", self.mygrid)
+        self.lookup_service.lookup(self.mycallEntry.text(), self.look_up)
 
     def changemycall(self):
         """change my call"""
@@ -1414,11 +1624,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.preference["mycall"] = self.mycallEntry.text()
         if self.preference["mycall"] != "":
             self.mycallEntry.setStyleSheet("border: 1px solid green;")
-            _thethread = threading.Thread(
-                target=self.lookupmygrid,
-                daemon=True,
-            )
-            _thethread.start()
+            self.lookupmygrid()
         else:
             self.mycallEntry.setStyleSheet("border: 1px solid red;")
         self.writepreferences()
@@ -1481,12 +1687,7 @@ class MainWindow(QtWidgets.QMainWindow):
                         self.cat_control.set_vfo(str(vfo))
                     self.clearinputs()
                     return
-                _thethread = threading.Thread(
-                    target=self.lazy_lookup,
-                    args=(self.callsign_entry.text(),),
-                    daemon=True,
-                )
-                _thethread.start()
+                self.lazy_lookup(self.callsign_entry.text())
                 self.class_entry.setFocus()
                 self.class_entry.deselect()
             else:
@@ -1500,6 +1701,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     self.get_opon()
                     self.clearinputs()
                     return
+                self.prefill_exchange(cleaned)
                 self.super_check()
 
     def classtest(self):
@@ -1576,19 +1778,29 @@ class MainWindow(QtWidgets.QMainWindow):
 
             self.power_selector.setValue(int(self.preference["power"]))
 
+            if self.preference.get("usetallies"):
+                self.db.enable_tallies()
+            elif self.db.tallies:
+                self.db.disable_tallies()
+
+            if self.cat_control:
+                self.cat_control.stop()
+                if not self.cat_control.wait():
+                    logger.warning("readpreferences: a CAT worker didn't stop")
+                self.cat_control.deleteLater()
             self.cat_control = None
-            if self.preference["useflrig"]:
-                self.cat_control = CAT(
-                    "flrig", self.preference["CAT_ip"], self.preference["CAT_port"]
-                )
-            if self.preference["userigctld"]:
-                self.cat_control = CAT(
-                    "rigctld", self.preference["CAT_ip"], self.preference["CAT_port"]
-                )
+            self.rigonline = False
+            radios = self.cat_radios()
+            if radios:
+                self.cat_control = self.start_cat(radios)
 
             if self.preference["useqrz"]:
-                self.look_up = QRZlookup(
-                    self.preference["lookupusername"], self.preference["lookuppassword"]
+                self.look_up = self.connect_callbook(
+                    QRZlookup(
+                        self.preference["lookupusername"],
+                        self.preference["lookuppassword"],
+                        connect=False,
+                    )
                 )
                 self.callbook_icon.setText("QRZ")
                 if self.look_up.session:
@@ -1597,14 +1809,17 @@ class MainWindow(QtWidgets.QMainWindow):
                     self.callbook_icon.setStyleSheet("color: rgb(136, 138, 133);")
 
             if self.preference["usehamdb"]:
-                self.look_up = HamDBlookup()
+                self.look_up = self.guard_lookup(HamDBlookup())
                 self.callbook_icon.setText("HamDB")
                 self.callbook_icon.setStyleSheet("color: rgb(128, 128, 0);")
 
             if self.preference["usehamqth"]:
-                self.look_up = HamQTH(
-                    self.preference["lookupusername"],
-                    self.preference["lookuppassword"],
+                self.look_up = self.connect_callbook(
+                    HamQTH(
+                        self.preference["lookupusername"],
+                        self.preference["lookuppassword"],
+                        connect=False,
+                    )
                 )
                 self.callbook_icon.setText("HamQTH")
                 if self.look_up.session:
@@ -1612,6 +1827,16 @@ class MainWindow(QtWidgets.QMainWindow):
                 else:
                     self.callbook_icon.setStyleSheet("color: rgb(136, 138, 133);")
 
+            if self.preference.get("uselocaldb"):
+                self.look_up = LocalDBlookup(
+                    self.preference.get("localdb", "callsigns.db")
+                )
+                self.callbook_icon.setText("Local")
+                if self.look_up.session:
+                    self.callbook_icon.setStyleSheet("color: rgb(128, 128, 0);")
+                else:
+                    self.callbook_icon.setStyleSheet("color: rgb(136, 138, 133);")
+
             self.cloudlogauth()
 
             if self.preference["cwtype"] == 0:
@@ -1722,6 +1947,13 @@ class MainWindow(QtWidgets.QMainWindow):
         if not self.cat_control:
             self.oldfreq = int(float(self.fakefreq(self.band, self.mode)) * 1000)
         unique_id = uuid.uuid4().hex
+        record = self.history.get(self.callsign_entry.text())
+        if record and self.contactlookup["call"] in (
+            "",
+            self.callsign_entry.text().upper(),
+        ):
+            self.contactlookup["name"] = self.contactlookup["name"] or record[2]
+            self.contactlookup["grid"] = self.contactlookup["grid"] or record[3]
         contact = (
             self.callsign_entry.text(),
             self.class_entry.text(),
@@ -1734,7 +1966,18 @@ class MainWindow(QtWidgets.QMainWindow):
             self.contactlookup["name"],
             unique_id,
         )
-        self.db.log_contact(contact)
+        contact_id = self.db.log_contact(contact)
+        if contact_id is not None:
+            self.dupe_index.add(
+                (
+                    self.callsign_entry.text(),
+                    self.class_entry.text(),
+                    self.section_entry.text(),
+                    self.band,
+                    self.mode,
+                )
+            )
+            self.scp.add_calls((self.callsign_entry.text(),))
 
         stale = datetime.now() + timedelta(seconds=30)
         if self.connect_to_server:
@@ -1800,35 +2043,26 @@ class MainWindow(QtWidgets.QMainWindow):
         self.sections()
         self.stats()
         self.updatemarker()
-        self.logwindow()
+        if contact_id is not None:
+            self.log_model.insert_contact(contact_id)
+            self.postcloudlog(contact_id)
         self.clearinputs()
-        self.postcloudlog()
         self.clearcontactlookup()
 
     def stats(self):
         """
         Get an idea of how you're doing points wise.
         """
-        (
-            cwcontacts,
-            phonecontacts,
-            digitalcontacts,
-            bandmodemult,
-            last15,
-            lasthour,
-            _,
-            _,
-        ) = self.db.stats()
+        tally = self.db.contact_stats()
+        self.Total_CW.setText(str(tally.cwcontacts))
+        self.Total_Phone.setText(str(tally.phonecontacts))
+        self.Total_Digital.setText(str(tally.digitalcontacts))
+        self.bandmodemult = tally.bandmodemult
+        self.QSO_Last15.setText(str(tally.last15))
+        self.QSO_PerHour.setText(str(tally.lasthour))
+        self.QSO_Points.setText(str(self.calcscore(tally)))
 
-        self.Total_CW.setText(str(cwcontacts))
-        self.Total_Phone.setText(str(phonecontacts))
-        self.Total_Digital.setText(str(digitalcontacts))
-        self.bandmodemult = bandmodemult
-        self.QSO_Last15.setText(str(last15))
-        self.QSO_PerHour.setText(str(lasthour))
-        self.QSO_Points.setText(str(self.calcscore()))
-
-    def calcscore(self):
+    def calcscore(self, tally=None):
         """
         Return our current score based on operating power,
         altpower and types of contacts.
@@ -1836,10 +2070,17 @@ class MainWindow(QtWidgets.QMainWindow):
         2022 scoring: contacts over 100w are disallowed.
         QRP and Low Power (<100W) have base multiplier of 2.
         QRP with Alt Power has base multiplier of 5
+
+        Pass in the ContactStats from db.contact_stats() if you already have them.
         """
-        self.qrpcheck()
-        c_dubs, phone, digital = self.db.contacts_under_101watts()
-        self.score = (int(c_dubs) * 2) + int(phone) + (int(digital) * 2)
+        if tally is None:
+            tally = self.db.contact_stats()
+        self.qrpcheck(tally)
+        self.score = (
+            (tally.cw_under_101 * 2)
+            + tally.phone_under_101
+            + (tally.digital_under_101 * 2)
+        )
         self.basescore = self.score
         multiplier = 2
         if self.qrp and self.preference["altpower"]:
@@ -1847,38 +2088,16 @@ class MainWindow(QtWidgets.QMainWindow):
         self.score = self.score * multiplier
         return self.score
 
-    def qrpcheck(self):
+    def qrpcheck(self, tally=None):
         """qrp = 5W cw, 10W ph and di, highpower not allowed in 2022"""
-        self.qrp, self.highpower = self.db.qrp_check()
+        if tally is None:
+            tally = self.db.contact_stats()
+        self.qrp, self.highpower = tally.qrp, tally.highpower
 
     def logwindow(self):
         """Populate log window with contacts"""
-        self.dupdict = {}
-        self.listWidget.clear()
-        log = self.db.fetch_all_contacts_desc()
-        for contact in log:
-            (
-                logid,
-                hiscall,
-                hisclass,
-                hissection,
-                the_datetime,
-                frequency,
-                band,
-                mode,
-                power,
-                _,
-                _,
-                _,
-                _,
-            ) = contact
-            logline = (
-                f"{str(logid).rjust(3,'0')} {hiscall.ljust(15)} {hisclass.rjust(3)} "
-                f"{hissection.rjust(3)} {the_datetime} {str(frequency).rjust(9)} "
-                f"{str(band).rjust(3)}M {mode} {str(power).rjust(3)}W"
-            )
-            self.listWidget.addItem(logline)
-            self.dupdict[f"{hiscall}{band}{mode}"] = True
+        self.log_model.reload()
+        self.log_view.resizeColumnsToContents()
 
     def qsoedited(self):
         """
@@ -1886,16 +2105,15 @@ class MainWindow(QtWidgets.QMainWindow):
         """
         self.sections()
         self.stats()
-        self.logwindow()
 
-    def qsoclicked(self):
+    def qsoclicked(self, index):
         """
-        Gets the line of the log clicked on, and passes that line to the edit dialog.
+        Gets the contact clicked on, and passes its id to the edit dialog.
         """
-        item = self.listWidget.currentItem()
-        self.linetopass = item.text()
         dialog = EditQSODialog(self)
-        dialog.set_up(self.linetopass, self.db)
+        dialog.set_up(self.log_model.contact_id(index.row()), self.db)
+        dialog.change.contactChanged.connect(self.log_model.refresh_contact)
+        dialog.change.contactDeleted.connect(self.log_model.remove_contact)
         dialog.change.lineChanged.connect(self.qsoedited)
         dialog.open()
 
@@ -1943,40 +2161,78 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def read_scp(self):
         """
-        Reads in a list of known contesters into an internal dictionary
+        Reads in a list of known contesters into the super check index
         """
         try:
-            data_path = self.working_path + "/data/MASTER.SCP"
-            with open(data_path, "r", encoding="utf-8") as file_descriptor:
-                self.scp = file_descriptor.readlines()
-                self.scp = list(map(lambda x: x.strip(), self.scp))
+            self.scp.load(self.working_path + "/data/MASTER.SCP")
+            self.scp.add_calls(self.dupe_index.worked)
         except IOError as exception:
             logger.critical("read_scp: read error: %s", exception)
 
     def super_check(self):
         """
         Performs a supercheck partial on the callsign entered in the field.
-        """
-        self.infobox.clear()
-        self.infobox.setTextColor(QtGui.QColor(211, 215, 207))
+        Keystrokes arriving within keystroke_debounce ms of each other are
+        coalesced, so only the last one starts a lookup.
+        """
+        self.supercheck_timer.start()
+
+    def cancel_super_check(self):
+        """Drops any pending or running supercheck so it can't repaint infobox."""
+        self.supercheck_timer.stop()
+        self.supercheck_generation += 1
+        if self.supercheck_future:
+            self.supercheck_future.cancel()
+            self.supercheck_future = None
+
+    def start_super_check(self):
+        """Hands the current callsign to the supercheck worker."""
+        self.cancel_super_check()
         acall = self.callsign_entry.text()
         if len(acall) > 2:
-            matches = list(filter(lambda x: x.startswith(acall), self.scp))
-            for match in matches:
-                self.infobox.insertPlainText(match + " ")
+            self.supercheck_future = self.supercheck_worker.submit(
+                self.find_super_check, self.supercheck_generation, acall
+            )
+        else:
+            self.infobox.clear()
+
+    def find_super_check(self, generation: int, acall: str):
+        """Runs on the worker, finds the SCP matches and N+1 suggestions."""
+        if generation != self.supercheck_generation:
+            return
+        matches = self.scp.search(acall, self.scp_limit, self.dupe_index.worked)
+        suggestions = [
+            call
+            for call in self.scp.near(
+                acall, self.nplusone_limit, self.dupe_index.worked
+            )
+            if call not in matches
+        ]
+        self.superCheckReady.emit(generation, acall, matches, suggestions)
+
+    def show_super_check(self, generation, acall, matches, suggestions):
+        """Paints a supercheck result, if it's for what's in the field now."""
+        if (
+            generation != self.supercheck_generation
+            or acall != self.callsign_entry.text()
+        ):
+            return
+        self.supercheck_future = None
+        self.infobox.clear()
+        self.infobox.setTextColor(QtGui.QColor(211, 215, 207))
+        self.infobox.insertPlainText(" ".join(matches))
+        if suggestions:
+            self.infobox.setTextColor(QtGui.QColor(245, 121, 0))
+            self.infobox.insertPlainText("\nN+1: " + " ".join(suggestions))
 
     def dup_check(self):
         """check for duplicates"""
+        self.cancel_super_check()
         self.check_dupe_status_udp()
         acall = self.callsign_entry.text()
         self.infobox.clear()
-        log = self.db.dup_check(acall)
-        for contact in log:
-            hiscall, hisclass, hissection, hisband, hismode = contact
-            if len(self.class_entry.text()) == 0:
-                self.class_entry.setText(hisclass)
-            if len(self.section_entry.text()) == 0:
-                self.section_entry.setText(hissection)
+        self.prefill_exchange(acall)
+        for hisband, hismode in self.dupe_index.bands_worked(acall):
             dupetext = ""
             if hisband == self.band and hismode == self.mode:
                 self.flash()
@@ -1984,7 +2240,33 @@ class MainWindow(QtWidgets.QMainWindow):
                 dupetext = " DUPE"
             else:
                 self.infobox.setTextColor(QtGui.QColor(211, 215, 207))
-            self.infobox.insertPlainText(f"{hiscall}: {hisband} {hismode}{dupetext}\n")
+            self.infobox.insertPlainText(
+                f"{acall.upper()}: {hisband} {hismode}{dupetext}\n"
+            )
+
+    def prefill_exchange(self, acall: str):
+        """
+        Fills in class and section for acall from this log, or failing that
+        from the call history. A field that still holds what we filled in
+        for an earlier call is replaced or cleared, one the operator typed
+        is left alone.
+        """
+        exchange = self.dupe_index.last_exchange(acall)
+        if not exchange:
+            record = self.history.get(acall)
+            exchange = record[:2] if record else ("", "")
+        filled = []
+        for entry, was, wanted in zip(
+            (self.class_entry, self.section_entry), self.prefilled, exchange
+        ):
+            text = entry.text()
+            if text and text != was:
+                filled.append("")
+                continue
+            if text != wanted:
+                entry.setText(wanted)
+            filled.append(wanted)
+        self.prefilled = tuple(filled)
 
     def worked_sections(self):
         """get sections worked"""
@@ -2120,28 +2402,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.sections_col4()
         self.sections_col5()
 
-    def get_band_mode_tally(self, band, mode):
-        """
-        Returns the amount of contacts and the maximum power
-        used for a particular band/mode combination.
-        """
-        return self.db.get_band_mode_tally(band, mode)
-
-    def getbands(self):
-        """
-        Returns a list of bands worked, and an empty list if none worked.
-        """
-        bandlist = []
-        list_o_bands = self.db.get_bands()
-        if list_o_bands:
-            for count in list_o_bands:
-                bandlist.append(count[0])
-            return bandlist
-        return []
-
     def generate_band_mode_tally(self):
         """generates band mode tally"""
-        blist = self.getbands()
+        tallies = self.db.fetch_band_mode_tallies()
+        blist = {band for band, _ in tallies}
         bmtfn = "Statistics.txt"
         try:
             with open(bmtfn, "w", encoding="utf-8") as file_descriptor:
@@ -2149,9 +2413,9 @@ class MainWindow(QtWidgets.QMainWindow):
                 print("-" * 60, end="\r\n", file=file_descriptor)
                 for band in self.bands:
                     if band in blist:
-                        cwt = self.get_band_mode_tally(band, "CW")
-                        dit = self.get_band_mode_tally(band, "DI")
-                        pht = self.get_band_mode_tally(band, "PH")
+                        cwt = tallies.get((band, "CW"), (0, None))
+                        dit = tallies.get((band, "DI"), (0, None))
+                        pht = tallies.get((band, "PH"), (0, None))
                         print(
                             f"Band:\t{band}\t{cwt[0]}\t{cwt[1]}\t{dit[0]}"
                             f"\t{dit[1]}\t{pht[0]}\t{pht[1]}",
@@ -2371,13 +2635,18 @@ class MainWindow(QtWidgets.QMainWindow):
         self.infobox.insertPlainText("Done\n\n")
         app.processEvents()
 
-    def postcloudlog(self):
+    def postcloudlog(self, contact_id=None):
         """
         Log contact to Cloudlog: https://github.com/magicbug/Cloudlog
+        Posts the contact with contact_id, or the last one logged.
         """
         if (not self.preference["cloudlog"]) or (not self.cloudlogauthenticated):
             return
-        contact = self.db.fetch_last_contact()
+        if contact_id is None:
+            contact = self.db.fetch_last_contact()
+        else:
+            found = self.db.contact_by_id(contact_id)
+            contact = found[0] if found else None
         if not contact:
             return
         (
@@ -2448,7 +2717,9 @@ class MainWindow(QtWidgets.QMainWindow):
             "string": adifq,
         }
         json_data = dumps(payload_dict)
-        _ = requests.post(self.preference["cloudlogurl"] + "qso/", json_data, timeout=5)
+        _ = http_session().post(
+            self.preference["cloudlogurl"] + "qso/", json_data, timeout=5
+        )
 
     def cabrillo(self):
         """
@@ -2461,6 +2732,8 @@ class MainWindow(QtWidgets.QMainWindow):
         log = self.db.fetch_all_contacts_asc()
         if not log:
             return
+        tally = self.db.contact_stats()
+        self.qrpcheck(tally)
         catpower = ""
         if self.qrp:
             catpower = "QRP"
@@ -2495,7 +2768,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 )
                 print(f"CATEGORY-POWER: {catpower}", end="\r\n", file=file_descriptor)
                 print(
-                    f"CLAIMED-SCORE: {self.calcscore()}",
+                    f"CLAIMED-SCORE: {self.calcscore(tally)}",
                     end="\r\n",
                     file=file_descriptor,
                 )
@@ -2562,6 +2835,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.infobox.clear()
         self.show_dirty_records()
         self.resolve_dirty_records()
+        if self.db.tallies and not self.db.rebuild_tallies():
+            self.infobox.setTextColor(QtGui.QColor(245, 121, 0))
+            self.infobox.insertPlainText("Running tallies were off, rebuilt them.\n")
+            self.stats()
         self.cabrillo()
         self.generate_band_mode_tally()
         self.adif()
@@ -2582,7 +2859,7 @@ class MainWindow(QtWidgets.QMainWindow):
 class EditQSODialog(QtWidgets.QDialog):
     """Edit QSO Dialog"""
 
-    theitem = ""
+    theitem = None
     database = None
 
     def __init__(self, parent=None):
@@ -2595,33 +2872,25 @@ class EditQSODialog(QtWidgets.QDialog):
         self.buttonBox.accepted.connect(self.save_changes)
         self.change = QsoEdit()
         self.unique_id = None
+        self.contact = {}
 
-    def set_up(self, linetopass, thedatabase):
+    def set_up(self, contact_id, thedatabase):
         """Set up variables"""
-        (
-            self.theitem,
-            thecall,
-            theclass,
-            thesection,
-            thedate,
-            thetime,
-            thefreq,
-            theband,
-            themode,
-            thepower,
-        ) = linetopass.split()
-        self.editCallsign.setText(thecall)
-        self.editClass.setText(theclass)
-        self.editSection.setText(thesection)
-        self.editFreq.setText(thefreq)
-        self.editBand.setCurrentIndex(self.editBand.findText(theband.replace("M", "")))
-        self.editMode.setCurrentIndex(self.editMode.findText(themode))
-        self.editPower.setValue(int(thepower[: len(thepower) - 1]))
-        date_time = thedate + " " + thetime
-        now = QtCore.QDateTime.fromString(date_time, "yyyy-MM-dd hh:mm:ss")
-        self.editDateTime.setDateTime(now)
         self.database = thedatabase
-        self.unique_id = self.database.get_unique_id(self.theitem)
+        self.theitem = contact_id
+        self.contact = self.database.fetch_contact(contact_id)
+        self.editCallsign.setText(self.contact.get("callsign"))
+        self.editClass.setText(self.contact.get("class"))
+        self.editSection.setText(self.contact.get("section"))
+        self.editFreq.setText(str(self.contact.get("frequency")))
+        self.editBand.setCurrentIndex(self.editBand.findText(self.contact.get("band")))
+        self.editMode.setCurrentIndex(self.editMode.findText(self.contact.get("mode")))
+        self.editPower.setValue(int(self.contact.get("power")))
+        now = QtCore.QDateTime.fromString(
+            self.contact.get("date_time"), "yyyy-MM-dd hh:mm:ss"
+        )
+        self.editDateTime.setDateTime(now)
+        self.unique_id = self.contact.get("unique_id")
 
     def save_changes(self):
         """Save update to db"""
@@ -2636,7 +2905,21 @@ class EditQSODialog(QtWidgets.QDialog):
             self.editFreq.text(),
             self.theitem,
         ]
+        oldguy = self.database.contact_by_id(self.theitem)
         self.database.change_contact(qso)
+        if oldguy:
+            window.dupe_index.remove(
+                (
+                    oldguy[0][1],
+                    oldguy[0][2],
+                    oldguy[0][3],
+                    oldguy[0][6],
+                    oldguy[0][7],
+                    oldguy[0][4],
+                )
+            )
+        window.dupe_index.add((qso[0], qso[1], qso[2], qso[4], qso[5], qso[3]))
+        window.scp.add_calls((qso[0],))
         if window.connect_to_server:
             stale = datetime.now() + timedelta(seconds=30)
             command = {"cmd": "UPDATE"}
@@ -2681,12 +2964,24 @@ class EditQSODialog(QtWidgets.QDialog):
                 window.n1mm.contact_info["points"] = "1"
             window.n1mm.send_contactreplace()
 
+        self.change.contactChanged.emit(self.theitem)
         self.change.lineChanged.emit()
 
     def delete_contact(self):
         """delete the contact"""
         oldguy = self.database.contact_by_id(self.theitem)
         self.database.delete_contact(self.theitem)
+        if oldguy:
+            window.dupe_index.remove(
+                (
+                    oldguy[0][1],
+                    oldguy[0][2],
+                    oldguy[0][3],
+                    oldguy[0][6],
+                    oldguy[0][7],
+                    oldguy[0][4],
+                )
+            )
         if window.connect_to_server:
             stale = datetime.now() + timedelta(seconds=30)
             command = {}
@@ -2711,6 +3006,7 @@ class EditQSODialog(QtWidgets.QDialog):
             window.n1mm.contactdelete["ID"] = self.unique_id
             window.n1mm.send_contact_delete()
 
+        self.change.contactDeleted.emit(self.theitem)
         self.change.lineChanged.emit()
         self.close()  # try:
 
@@ -2795,11 +3091,7 @@ window.read_cw_macros()
 window.changeband()
 window.changemode()
 if window.preference["mycall"] != "":
-    thethread = threading.Thread(
-        target=window.lookupmygrid,
-        daemon=True,
-    )
-    thethread.start()
+    window.lookupmygrid()
 if (
     window.preference["mycall"] == ""
     or window.preference["myclass"] == ""
@@ -2811,7 +3103,6 @@ if (
     startupdialog.set_call_sign(window.preference["mycall"])
     startupdialog.set_class(window.preference["myclass"])
     startupdialog.set_section(window.preference["mysection"])
-window.cloudlogauth()
 window.stats()
 window.read_sections()
 window.read_scp()
@@ -0,0 +1,226 @@
+"""
+Call history from earlier Field Days, used to prefill the exchange.
+
+python -m fdlogger.lib.call_history FieldDay.adi 2022.log FieldDay2021.db
+
+Each file is an ADIF file (.adi, .adif), a Cabrillo file (.log, .cbr) or
+an old FieldDay.db. The last class, section, name and grid seen for each
+call is kept in call_history.db, which the logger loads at startup.
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+logger = logging.getLogger("__name__")
+
+ADIF_TAG = re.compile(r"<([A-Za-z_]+)(?::(\d+)(?::[^>]*)?)?>")
+
+
+class CallHistory:
+    """
+    Keeps the last known (class, section, name, grid) for each call.
+
+    The history lives in a small SQLite database and is held in a dict
+    while the logger runs, so get() is a single lookup on every keystroke.
+    """
+
+    def __init__(self, database: str) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.database = database
+        self.calls = {}
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens the history database, creating the table if needed."""
+        conn = sqlite3.connect(self.database)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "call TEXT PRIMARY KEY NOT NULL, "
+            "class TEXT NOT NULL, "
+            "section TEXT NOT NULL, "
+            "name TEXT NOT NULL DEFAULT '', "
+            "grid TEXT NOT NULL DEFAULT '', "
+            "seen TEXT NOT NULL DEFAULT '') WITHOUT ROWID;"
+        )
+        return conn
+
+    def load(self) -> None:
+        """Reads the history into memory. A missing file is an empty history."""
+        self.calls = {}
+        if not Path(self.database).exists():
+            return
+        try:
+            conn = self.connect()
+            try:
+                self.calls = {
+                    row[0]: tuple(row[1:])
+                    for row in conn.execute(
+                        "select call, class, section, name, grid from history;"
+                    )
+                }
+            finally:
+                conn.close()
+        except sqlite3.Error as exception:
+            self.logger.critical("CallHistory load: %s", exception)
+        self.logger.debug("CallHistory: loaded %s calls", len(self.calls))
+
+    def get(self, call: str):
+        """Returns the (class, section, name, grid) last seen for call, or None."""
+        return self.calls.get(call.upper())
+
+    def merge(self, records) -> int:
+        """
+        Adds (call, class, section, name, grid, seen) records to the history.
+        A call already known is only replaced by a record seen as late or
+        later, and a blank name or grid doesn't wipe out a known one.
+        Returns the number of records read.
+        """
+        count = 0
+        conn = self.connect()
+        try:
+            with conn:
+                for record in records:
+                    conn.execute(
+                        "INSERT INTO history "
+                        "(call, class, section, name, grid, seen) "
+                        "VALUES (?,?,?,?,?,?) "
+                        "ON CONFLICT (call) DO UPDATE SET "
+                        "class = excluded.class, "
+                        "section = excluded.section, "
+                        "name = coalesce(nullif(excluded.name, ''), name), "
+                        "grid = coalesce(nullif(excluded.grid, ''), grid), "
+                        "seen = excluded.seen "
+                        "WHERE excluded.seen >= seen;",
+                        record,
+                    )
+                    count += 1
+        finally:
+            conn.close()
+        return count
+
+    def import_file(self, filename: str) -> int:
+        """Merges an ADIF, Cabrillo or FieldDay.db file into the history."""
+        suffix = Path(filename).suffix.lower()
+        if suffix == ".db":
+            return self.merge(read_database(filename))
+        with open(filename, "r", encoding="utf-8", errors="replace") as file_descriptor:
+            text = file_descriptor.read()
+        if suffix in (".adi", ".adif") or "<EOR>" in text.upper():
+            return self.merge(read_adif(text))
+        return self.merge(read_cabrillo(text))
+
+
+def seen_stamp(date: str, time_on: str) -> str:
+    """
+    Returns date and time as YYYYMMDDHHMM, whatever punctuation they came
+    with and whether or not the time has seconds, so every reader's stamps
+    sort the same way.
+    """
+    date = "".join(ch for ch in date if ch.isdigit())[:8]
+    time_on = "".join(ch for ch in time_on if ch.isdigit())[:4]
+    return date + time_on.ljust(4, "0") if date else ""
+
+
+def read_adif(text: str):
+    """Yields (call, class, section, name, grid, seen) records from ADIF text."""
+    fields = {}
+    position = 0
+    while True:
+        tag = ADIF_TAG.search(text, position)
+        if tag is None:
+            return
+        name = tag.group(1).upper()
+        length = int(tag.group(2) or 0)
+        position = tag.end() + length
+        if name == "EOH":
+            fields = {}
+        elif name == "EOR":
+            call = fields.get("CALL", "").upper()
+            hisclass = fields.get("CLASS", "")
+            hissection = fields.get("ARRL_SECT", "")
+            if not (hisclass and hissection):
+                exchange = fields.get("SRX_STRING", "").split()
+                if len(exchange) == 2:
+                    hisclass, hissection = exchange
+            if call and hisclass and hissection:
+                yield (
+                    call,
+                    hisclass.upper(),
+                    hissection.upper(),
+                    fields.get("NAME", ""),
+                    fields.get("GRIDSQUARE", ""),
+                    seen_stamp(fields.get("QSO_DATE", ""), fields.get("TIME_ON", "")),
+                )
+            fields = {}
+        elif length:
+            fields[name] = text[tag.end() : position].strip()
+
+
+def read_cabrillo(text: str):
+    """Yields (call, class, section, name, grid, seen) records from a Cabrillo log."""
+    for line in text.splitlines():
+        tokens = line.split()
+        if len(tokens) < 11 or tokens[0].upper() != "QSO:":
+            continue
+        call, hisclass, hissection = (token.upper() for token in tokens[-3:])
+        yield call, hisclass, hissection, "", "", seen_stamp(tokens[3], tokens[4])
+
+
+def read_database(filename: str):
+    """Yields (call, class, section, name, grid, seen) records from a FieldDay.db."""
+    uri = Path(filename).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        for call, hisclass, hissection, name, grid, date_time in conn.execute(
+            "select callsign, class, section, opname, grid, date_time "
+            "from contacts order by date_time;"
+        ):
+            yield (
+                call.upper(),
+                hisclass,
+                hissection,
+                name or "",
+                grid or "",
+                seen_stamp(date_time[:10], date_time[11:16]),
+            )
+    finally:
+        conn.close()
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Import old Field Day logs into the call history."
+    )
+    parser.add_argument(
+        "logs", type=str, nargs="+", help="ADIF, Cabrillo or FieldDay.db files"
+    )
+    parser.add_argument(
+        "--database",
+        type=str,
+        default="call_history.db",
+        help="call history database to create or update (default call_history.db)",
+    )
+    args = parser.parse_args()
+    history = CallHistory(args.database)
+    for filename in args.logs:
+        start = time.perf_counter()
+        try:
+            count = history.import_file(filename)
+        except (OSError, sqlite3.Error) as exception:
+            print(f"{filename}: import failed: {exception}", file=sys.stderr)
+            continue
+        print(
+            f"{filename}: {count} contacts in "
+            f"{time.perf_counter() - start:.1f} seconds"
+        )
+    history.load()
+    print(f"{len(history.calls)} calls in {args.database}")
+
+
+if __name__ == "__main__":
+    main()
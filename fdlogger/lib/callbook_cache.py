@@ -0,0 +1,141 @@
+"""On disk cache for callbook lookups"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+
+class CallbookCache:
+    """
+    Keeps callbook results in a small SQLite database so a call looked up
+    once is answered locally on later bands, modes and restarts.
+
+    Found calls are kept for ttl seconds. Calls the callbook says it doesn't
+    know are kept for negative_ttl seconds, so they aren't asked for on every
+    keystroke either. Network errors are never cached.
+    """
+
+    def __init__(
+        self, database: str, ttl: int = 30 * 86400, negative_ttl: int = 86400
+    ) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.database = database
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.conn = None
+        self.lock = threading.RLock()
+        self.create_db()
+
+    def connect(self) -> sqlite3.Connection:
+        """Returns the long lived connection to the cache, opening it if needed."""
+        with self.lock:
+            if self.conn is None:
+                self.conn = sqlite3.connect(self.database, check_same_thread=False)
+                self.conn.execute("PRAGMA journal_mode=WAL;")
+                self.conn.execute("PRAGMA synchronous=NORMAL;")
+            return self.conn
+
+    def close(self) -> None:
+        """Closes the connection."""
+        with self.lock:
+            if self.conn is not None:
+                try:
+                    self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+                    self.conn.close()
+                except sqlite3.Error as exception:
+                    self.logger.critical("CallbookCache close: %s", exception)
+                self.conn = None
+
+    def create_db(self) -> None:
+        """Creates the cache table and drops expired entries."""
+        try:
+            with self.lock, self.connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS callbook ("
+                    "provider TEXT NOT NULL, "
+                    "call TEXT NOT NULL, "
+                    "grid TEXT, "
+                    "name TEXT, "
+                    "nickname TEXT, "
+                    "error TEXT, "
+                    "found INTEGER NOT NULL, "
+                    "expires REAL NOT NULL, "
+                    "PRIMARY KEY (provider, call)) WITHOUT ROWID;"
+                )
+                conn.execute("delete from callbook where expires < ?;", (time.time(),))
+        except sqlite3.Error as exception:
+            self.logger.critical("CallbookCache create_db: %s", exception)
+
+    def get(self, provider: str, call: str):
+        """
+        Returns the cached (grid, name, nickname, error_text) for call,
+        or None if it isn't cached or has expired.
+        """
+        try:
+            with self.lock, self.connect() as conn:
+                row = conn.execute(
+                    "select grid, name, nickname, error from callbook "
+                    "where provider = ? and call = ? and expires >= ?;",
+                    (provider, call.upper(), time.time()),
+                ).fetchone()
+        except sqlite3.Error as exception:
+            self.logger.critical("CallbookCache get: %s", exception)
+            return None
+        if row is None:
+            return None
+        return tuple(field if field is not None else False for field in row)
+
+    def put(self, provider: str, call: str, result: tuple, found: bool) -> None:
+        """Stores a (grid, name, nickname, error_text) lookup result."""
+        ttl = self.ttl if found else self.negative_ttl
+        fields = tuple(str(field) if field else None for field in result)
+        try:
+            with self.lock, self.connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO callbook "
+                    "(provider, call, grid, name, nickname, error, found, expires) "
+                    "VALUES (?,?,?,?,?,?,?,?);",
+                    (provider, call.upper(), *fields, int(found), time.time() + ttl),
+                )
+        except sqlite3.Error as exception:
+            self.logger.critical("CallbookCache put: %s", exception)
+
+
+class CachedLookup:
+    """
+    Puts a CallbookCache in front of a QRZlookup, HamDBlookup or HamQTH.
+    Answers and "not found"s are kept, errors never are, so a call that
+    failed to look up is tried again next time. Attributes like session
+    and error are read from the provider, so the window can treat this as
+    the provider itself.
+    """
+
+    def __init__(self, provider, cache: CallbookCache, name: str = None) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.provider = provider
+        self.cache = cache
+        self.name = name or getattr(provider, "name", None) or type(provider).__name__
+
+    def __getattr__(self, attribute):
+        return getattr(self.provider, attribute)
+
+    @staticmethod
+    def not_found(error_text) -> bool:
+        """True if the callbook answered that it doesn't know the call."""
+        text = str(error_text).upper().replace("_", " ")
+        return "NOT FOUND" in text
+
+    def lookup(self, call: str) -> tuple:
+        """Returns (grid, name, nickname, error_text), from the cache if we can."""
+        cached = self.cache.get(self.name, call)
+        if cached is not None:
+            self.logger.debug("CachedLookup: %s %s from cache", self.name, call)
+            return cached
+        result = self.provider.lookup(call)
+        grid, name, _, error_text = result
+        if self.not_found(error_text):
+            self.cache.put(self.name, call, result, False)
+        elif (grid or name) and self.provider.error is not True:
+            self.cache.put(self.name, call, result, True)
+        return result
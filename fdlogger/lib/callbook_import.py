@@ -0,0 +1,129 @@
+"""
+Builds the local callbook database used by LocalDBlookup.
+
+python -m fdlogger.lib.callbook_import callsigns.csv [callsigns.db]
+
+The source is a delimited text file with one call, name, grid, state record
+per line. Commas, pipes, tabs and semicolons are all understood. A header
+line naming the columns is used if there is one, otherwise the columns are
+taken in that order.
+"""
+
+import argparse
+import csv
+import itertools
+import logging
+import sqlite3
+import sys
+import time
+
+logger = logging.getLogger("__name__")
+
+COLUMNS = ("call", "name", "grid", "state")
+BATCH = 10000
+
+
+def create_table(conn: sqlite3.Connection) -> None:
+    """Creates the callsigns table if it isn't there."""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS callsigns ("
+        "call TEXT PRIMARY KEY NOT NULL, "
+        "name TEXT, "
+        "grid TEXT, "
+        "state TEXT) WITHOUT ROWID;"
+    )
+
+
+def read_records(file_descriptor):
+    """Yields (call, name, grid, state) tuples from a delimited text file."""
+    sample = file_descriptor.read(8192)
+    file_descriptor.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",|\t;")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(file_descriptor, dialect)
+    first = next(reader, None)
+    if first is None:
+        return
+    header = [column.strip().lower() for column in first]
+    if "call" in header or "callsign" in header:
+        header = ["call" if column == "callsign" else column for column in header]
+        positions = [
+            header.index(column) if column in header else None for column in COLUMNS
+        ]
+        rows = reader
+    else:
+        positions = list(range(len(COLUMNS)))
+        rows = itertools.chain((first,), reader)
+    for row in rows:
+        record = tuple(
+            row[position].strip()
+            if position is not None and position < len(row)
+            else ""
+            for position in positions
+        )
+        if record[0]:
+            yield (record[0].upper(),) + record[1:]
+
+
+def import_callsigns(source: str, database: str) -> int:
+    """
+    Streams the records in source into database, replacing any calls
+    already there. Returns the number of records read.
+    """
+    count = 0
+    with open(
+        source, "r", encoding="utf-8", errors="replace", newline=""
+    ) as file_descriptor:
+        conn = sqlite3.connect(database)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF;")
+            conn.execute("PRAGMA synchronous=OFF;")
+            create_table(conn)
+            records = read_records(file_descriptor)
+            with conn:
+                while True:
+                    batch = list(itertools.islice(records, BATCH))
+                    if not batch:
+                        break
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO callsigns (call, name, grid, state) "
+                        "VALUES (?,?,?,?);",
+                        batch,
+                    )
+                    count += len(batch)
+            conn.execute("ANALYZE;")
+        finally:
+            conn.close()
+    return count
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Import a call/name/grid/state file into a local callbook."
+    )
+    parser.add_argument("source", type=str, help="delimited text file to import")
+    parser.add_argument(
+        "database",
+        type=str,
+        nargs="?",
+        default="callsigns.db",
+        help="callbook database to create or update (default callsigns.db)",
+    )
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        count = import_callsigns(args.source, args.database)
+    except (OSError, sqlite3.Error) as exception:
+        print(f"import failed: {exception}", file=sys.stderr)
+        sys.exit(1)
+    print(
+        f"imported {count} records into {args.database} "
+        f"in {time.perf_counter() - start:.1f} seconds"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,58 @@
 """CAT interface abstraction"""
 
+import http.client
 import logging
-import socket
+import time
 import xmlrpc.client
 
+from .rigctld import RigctldClient
 
-class CAT:
+
+def method_name(request_body: bytes) -> str:
+    """Returns the method an XML-RPC request body calls."""
+    start = request_body.find(b"<methodName>") + len(b"<methodName>")
+    return request_body[start : request_body.find(b"</methodName>")].decode()
+
+
+class FlrigTransport(xmlrpc.client.Transport):
+    """
+    XML-RPC transport for flrig. Keeps one HTTP connection open between
+    calls, gives up on a call after timeout seconds and keeps
+    (count, total seconds, worst seconds) for each method in latency.
+    """
+
+    def __init__(self, timeout: float = 1.0) -> None:
+        super().__init__()
+        self.timeout = timeout
+        self.latency = {}
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+    def request(self, host, handler, request_body, verbose=False):
+        start = time.perf_counter()
+        try:
+            return super().request(host, handler, request_body, verbose)
+        finally:
+            elapsed = time.perf_counter() - start
+            name = method_name(request_body)
+            count, total, worst = self.latency.get(name, (0, 0.0, 0.0))
+            self.latency[name] = (count + 1, total + elapsed, max(worst, elapsed))
+
+
+class CAT:  # pylint: disable=too-many-instance-attributes
     """CAT control rigctld or flrig"""
 
+    flrig_status = (
+        "rig.get_vfo",
+        "rig.get_mode",
+        "rig.get_bw",
+        "rig.get_ptt",
+        "rig.get_power",
+    )
+
     def __init__(self, interface: str, host: str, port: int) -> None:
         """
         Computer Aided Tranceiver abstraction class.
@@ -24,12 +69,20 @@ class CAT:
 
         Exposed methods are:
 
+        close()
+
         get_vfo()
 
         get_mode()
 
         get_power()
 
+        get_ptt()
+
+        get_status()
+
+        latency_report()
+
         set_vfo()
 
         set_mode()
@@ -41,7 +94,9 @@ class CAT:
         """
         self.logger = logging.getLogger("__name__")
         self.server = None
-        self.rigctrlsocket = None
+        self.transport = None
+        self.multicall = True
+        self.rigctld = None
         self.interface = interface.lower()
         self.host = host
         self.port = port
@@ -49,19 +104,25 @@ class CAT:
         if self.interface == "flrig":
             target = f"http://{host}:{port}"
             self.logger.debug("%s", target)
-            self.server = xmlrpc.client.ServerProxy(target)
+            self.transport = FlrigTransport()
+            self.server = xmlrpc.client.ServerProxy(target, transport=self.transport)
         if self.interface == "rigctld":
+            self.rigctld = RigctldClient(host, port)
             self.__initialize_rigctrld()
 
+    def close(self) -> None:
+        """Closes the connection to flrig or rigctld."""
+        if self.transport:
+            self.transport.close()
+        if self.rigctld:
+            self.rigctld.close()
+        self.online = False
+
     def __initialize_rigctrld(self):
         try:
-            self.rigctrlsocket = socket.socket()
-            self.rigctrlsocket.settimeout(0.5)
-            self.rigctrlsocket.connect((self.host, self.port))
-            self.logger.debug("Connected to rigctrld")
+            self.rigctld.connect()
             self.online = True
-        except ConnectionRefusedError as exception:
-            self.rigctrlsocket = None
+        except OSError as exception:
             self.online = False
             self.logger.debug("%s", exception)
 
@@ -76,19 +137,7 @@ class CAT:
 
     def sendcwrigctl(self, texttosend):
         """..."""
-        if self.rigctrlsocket:
-            try:
-                self.online = True
-                self.rigctrlsocket.send(bytes(f"b{texttosend}\n", "utf-8"))
-                _ = self.rigctrlsocket.recv(1024).decode().strip()
-                return True
-            except socket.error as exception:
-                self.online = False
-                self.logger.debug("setvfo_rigctld: %s", f"{exception}")
-                self.rigctrlsocket = None
-                return False
-        self.__initialize_rigctrld()
-        return False
+        return self.__value_rigctld(f"send_morse {texttosend}", None) is not None
 
     def sendcwxmlrpc(self, texttosend):
         """..."""
@@ -118,19 +167,7 @@ class CAT:
 
     def __getvfo_rigctld(self) -> str:
         """Returns VFO freq returned from rigctld"""
-        if self.rigctrlsocket:
-            try:
-                self.online = True
-                self.rigctrlsocket.send(b"\nf\n")
-                return self.rigctrlsocket.recv(1024).decode().strip()
-            except socket.error as exception:
-                self.online = False
-                self.logger.debug("getvfo_rigctld: %s", exception)
-                self.rigctrlsocket = None
-            return ""
-
-        self.__initialize_rigctrld()
-        return ""
+        return self.__value_rigctld("get_freq")
 
     def get_mode(self) -> str:
         """Returns the current mode filter width of the radio"""
@@ -154,23 +191,7 @@ class CAT:
 
     def __getmode_rigctld(self) -> str:
         """Returns mode vai rigctld"""
-        if self.rigctrlsocket:
-            try:
-                self.online = True
-                self.rigctrlsocket.send(b"m\n")
-                mode = self.rigctrlsocket.recv(1024).decode()
-                self.logger.debug("%s", mode)
-                mode = mode.strip().split()[0]
-                return mode
-            except IndexError as exception:
-                self.logger.debug("%s", exception)
-            except socket.error as exception:
-                self.online = False
-                self.logger.debug("%s", exception)
-                self.rigctrlsocket = None
-            return ""
-        self.__initialize_rigctrld()
-        return ""
+        return self.__value_rigctld("get_mode")
 
     def get_power(self):
         """Get power level from rig"""
@@ -190,16 +211,11 @@ class CAT:
             return ""
 
     def __getpower_rigctld(self):
-        if self.rigctrlsocket:
-            try:
-                self.online = True
-                self.rigctrlsocket.send(b"l RFPOWER\n")
-                return int(float(self.rigctrlsocket.recv(1024).decode().strip()) * 100)
-            except socket.error as exception:
-                self.online = False
-                self.logger.debug("getpower_rigctld: %s", exception)
-                self.rigctrlsocket = None
-            return ""
+        try:
+            return int(float(self.__value_rigctld("get_level RFPOWER")) * 100)
+        except ValueError as exception:
+            self.logger.debug("getpower_rigctld: %s", exception)
+        return ""
 
     def get_ptt(self):
         """Get PTT state"""
@@ -221,19 +237,133 @@ class CAT:
 
     def __getptt_rigctld(self):
         """Returns ptt state via rigctld"""
-        if self.rigctrlsocket:
+        return self.__value_rigctld("get_ptt", "0")
+
+    def get_status(self) -> dict:
+        """
+        Returns the radio's vfo, mode, passband, ptt and power together,
+        in a dict keyed by those names. Anything the radio didn't answer
+        is an empty string.
+        """
+        if self.interface == "flrig":
+            return self.__getstatus_flrig()
+        if self.interface == "rigctld":
+            return self.__getstatus_rigctld()
+        return {}
+
+    def __getstatus_flrig(self) -> dict:
+        """
+        Returns the status via flrig in one system.multicall request,
+        or one call at a time if this flrig won't take a multicall.
+        """
+        status = {"vfo": "", "mode": "", "passband": "", "ptt": "", "power": ""}
+        try:
+            values = []
+            if self.multicall:
+                calls = xmlrpc.client.MultiCall(self.server)
+                for method in self.flrig_status:
+                    getattr(calls, method)()
+                try:
+                    results = calls()
+                except xmlrpc.client.Fault as exception:
+                    self.logger.info("flrig won't multicall: %s", exception)
+                    self.multicall = False
+                    return self.__getstatus_flrig()
+                for index in range(len(self.flrig_status)):
+                    try:
+                        values.append(results[index])
+                    except xmlrpc.client.Fault:
+                        values.append("")
+            else:
+                for method in self.flrig_status:
+                    try:
+                        values.append(getattr(self.server, method)())
+                    except xmlrpc.client.Fault:
+                        values.append("")
+        except (OSError, xmlrpc.client.Error, http.client.HTTPException) as exception:
+            self.online = False
+            self.logger.debug("getstatus_flrig: %s", exception)
+            return status
+        self.online = True
+        results = dict(zip(self.flrig_status, values))
+        status["vfo"] = results["rig.get_vfo"]
+        status["mode"] = results["rig.get_mode"]
+        status["ptt"] = results["rig.get_ptt"]
+        status["power"] = results["rig.get_power"]
+        bandwidth = results["rig.get_bw"]
+        if isinstance(bandwidth, list):
+            bandwidth = bandwidth[0] if bandwidth else ""
+        status["passband"] = str(bandwidth)
+        return status
+
+    def latency_report(self) -> dict:
+        """
+        Returns {method: (calls, mean seconds, worst seconds)} for the
+        flrig calls made so far. Empty for rigctld.
+        """
+        if not self.transport:
+            return {}
+        return {
+            name: (count, total / count, worst)
+            for name, (count, total, worst) in self.transport.latency.items()
+        }
+
+    def __getstatus_rigctld(self) -> dict:
+        """
+        Returns the status via rigctld, with the commands sent together
+        so it costs one round trip.
+        """
+        status = {"vfo": "", "mode": "", "passband": "", "ptt": "", "power": ""}
+        replies = self.__transact_rigctld(
+            "get_freq", "get_mode", "get_ptt", "get_level RFPOWER"
+        )
+        if replies is None:
+            return status
+        freq, mode, ptt, power = (
+            values if code == 0 else [] for values, code in replies
+        )
+        if freq:
+            status["vfo"] = freq[0]
+        if mode:
+            status["mode"] = mode[0]
+            status["passband"] = mode[1] if len(mode) > 1 else ""
+        if ptt:
+            status["ptt"] = ptt[0]
+        if power:
             try:
-                self.online = True
-                self.rigctrlsocket.send(b"t\n")
-                ptt = self.rigctrlsocket.recv(1024).decode()
-                self.logger.debug("%s", ptt)
-                ptt = ptt.strip()
-                return ptt
-            except socket.error as exception:
-                self.online = False
-                self.logger.debug("%s", exception)
-                self.rigctrlsocket = None
-        return "0"
+                status["power"] = int(float(power[0]) * 100)
+            except ValueError:
+                pass
+        return status
+
+    def __transact_rigctld(self, *commands):
+        """
+        Sends commands to rigctld, connecting first if need be. Returns
+        their (values, code) replies, or None if rigctld couldn't be reached.
+        """
+        try:
+            replies = self.rigctld.transact(*commands)
+        except OSError as exception:
+            self.online = False
+            self.logger.debug("rigctld %s: %s", commands, exception)
+            return None
+        self.online = True
+        return replies
+
+    def __value_rigctld(self, command: str, default=""):
+        """
+        Returns the first value rigctld answered command with, or an empty
+        string for a set command that worked. Returns default if rigctld
+        couldn't be reached or turned the command down.
+        """
+        replies = self.__transact_rigctld(command)
+        if replies is None:
+            return default
+        values, code = replies[0]
+        if code:
+            self.logger.debug("rigctld %s: RPRT %s", command, code)
+            return default
+        return values[0] if values else ""
 
     def set_vfo(self, freq: str) -> bool:
         """Sets the radios vfo"""
@@ -255,19 +385,7 @@ class CAT:
 
     def __setvfo_rigctld(self, freq: str) -> bool:
         """sets the radios vfo"""
-        if self.rigctrlsocket:
-            try:
-                self.online = True
-                self.rigctrlsocket.send(bytes(f"F {freq}\n", "utf-8"))
-                _ = self.rigctrlsocket.recv(1024).decode().strip()
-                return True
-            except socket.error as exception:
-                self.online = False
-                self.logger.debug("setvfo_rigctld: %s", exception)
-                self.rigctrlsocket = None
-                return False
-        self.__initialize_rigctrld()
-        return False
+        return self.__value_rigctld(f"set_freq {freq}", None) is not None
 
     def set_mode(self, mode: str) -> bool:
         """Sets the radios mode"""
@@ -289,19 +407,7 @@ class CAT:
 
     def __setmode_rigctld(self, mode: str) -> bool:
         """sets the radios mode"""
-        if self.rigctrlsocket:
-            try:
-                self.online = True
-                self.rigctrlsocket.send(bytes(f"M {mode} 0\n", "utf-8"))
-                _ = self.rigctrlsocket.recv(1024).decode().strip()
-                return True
-            except socket.error as exception:
-                self.online = False
-                self.logger.debug("setmode_rigctld: %s", exception)
-                self.rigctrlsocket = None
-                return False
-        self.__initialize_rigctrld()
-        return False
+        return self.__value_rigctld(f"set_mode {mode} 0", None) is not None
 
     def set_power(self, power):
         """Sets the radios power"""
@@ -322,11 +428,8 @@ class CAT:
 
     def __setpower_rigctld(self, power):
         if power.isnumeric() and int(power) >= 1 and int(power) <= 100:
-            rig_cmd = bytes(f"L RFPOWER {str(float(power) / 100)}\n", "utf-8")
-            try:
-                self.online = True
-                self.rigctrlsocket.send(rig_cmd)
-                _ = self.rigctrlsocket.recv(1024).decode().strip()
-            except socket.error:
-                self.online = False
-                self.rigctrlsocket = None
+            return (
+                self.__value_rigctld(f"set_level RFPOWER {float(power) / 100}", None)
+                is not None
+            )
+        return False
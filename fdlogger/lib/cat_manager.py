@@ -0,0 +1,124 @@
+"""Runs one CAT worker per radio"""
+
+import logging
+import time
+
+from PyQt5 import QtCore
+
+from .cat_worker import CATWorker
+
+
+class CATManager(QtCore.QObject):
+    """
+    Polls any number of radios, each with its own CATWorker, for a station
+    watching more than one rig.
+
+    Radios are numbered from 1 in the order they're added. One of them has
+    the focus: that's the one the entry window follows and the one
+    set_vfo(), set_mode(), set_power() and sendcw() go to. The active radio
+    is whichever one is transmitting, or the focus radio if none is.
+
+    radioChanged, pttChanged and onlineChanged are the worker's signals
+    with the radio number in front. focusChanged(radio_nr) is emitted when
+    the focus moves.
+    """
+
+    radioChanged = QtCore.pyqtSignal(int, str, str)
+    pttChanged = QtCore.pyqtSignal(int, bool)
+    onlineChanged = QtCore.pyqtSignal(int, bool)
+    focusChanged = QtCore.pyqtSignal(int)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.logger = logging.getLogger("__name__")
+        self.radios = {}
+        self.states = {}
+        self.focus = 1
+
+    def add_radio(self, interface: str, host: str, port: int) -> int:
+        """Starts polling another radio and returns its number."""
+        radio_nr = len(self.radios) + 1
+        worker = CATWorker(interface, host, port, parent=self)
+        worker.radio_nr = radio_nr
+        worker.radioChanged.connect(self.worker_radio_changed)
+        worker.pttChanged.connect(self.worker_ptt_changed)
+        worker.onlineChanged.connect(self.worker_online_changed)
+        self.radios[radio_nr] = worker
+        self.states[radio_nr] = {"vfo": "", "mode": "", "ptt": False, "online": False}
+        worker.start()
+        self.logger.info("Radio %s: %s %s:%s", radio_nr, interface, host, port)
+        return radio_nr
+
+    def stop(self) -> None:
+        """Stops every worker."""
+        for worker in self.radios.values():
+            worker.stop()
+
+    def wait(self, timeout: float = 2.0) -> bool:
+        """
+        Waits up to timeout seconds in all for the stopped workers to close
+        their connections. Returns False if any is still busy with its radio.
+        """
+        deadline = time.monotonic() + timeout
+        for worker in self.radios.values():
+            worker.thread.join(max(0.0, deadline - time.monotonic()))
+        return not any(worker.thread.is_alive() for worker in self.radios.values())
+
+    def state(self, radio_nr: int) -> dict:
+        """Returns the last vfo, mode, ptt and online reported by a radio."""
+        return self.states.get(radio_nr, {})
+
+    @property
+    def active(self) -> int:
+        """The radio that's transmitting, or the focus radio."""
+        if self.states.get(self.focus, {}).get("ptt"):
+            return self.focus
+        for radio_nr, state in self.states.items():
+            if state["ptt"]:
+                return radio_nr
+        return self.focus
+
+    def set_focus(self, radio_nr: int) -> None:
+        """Moves the focus to another radio."""
+        if radio_nr in self.radios and radio_nr != self.focus:
+            self.focus = radio_nr
+            self.focusChanged.emit(radio_nr)
+
+    def next_focus(self) -> None:
+        """Moves the focus to the next radio, round to the first after the last."""
+        if self.radios:
+            self.set_focus(self.focus % len(self.radios) + 1)
+
+    def set_vfo(self, freq) -> None:
+        """Tunes the focus radio."""
+        self.radios[self.focus].set_vfo(freq)
+
+    def set_mode(self, mode: str) -> None:
+        """Changes the focus radio's mode."""
+        self.radios[self.focus].set_mode(mode)
+
+    def set_power(self, power) -> None:
+        """Changes the focus radio's power."""
+        self.radios[self.focus].set_power(power)
+
+    def sendcw(self, texttosend: str) -> None:
+        """Sends CW from the focus radio."""
+        self.radios[self.focus].sendcw(texttosend)
+
+    def worker_radio_changed(self, vfo: str, mode: str) -> None:
+        """Passes on a worker's radioChanged with its radio number."""
+        radio_nr = self.sender().radio_nr
+        self.states[radio_nr].update(vfo=vfo, mode=mode)
+        self.radioChanged.emit(radio_nr, vfo, mode)
+
+    def worker_ptt_changed(self, transmitting: bool) -> None:
+        """Passes on a worker's pttChanged with its radio number."""
+        radio_nr = self.sender().radio_nr
+        self.states[radio_nr]["ptt"] = transmitting
+        self.pttChanged.emit(radio_nr, transmitting)
+
+    def worker_online_changed(self, online: bool) -> None:
+        """Passes on a worker's onlineChanged with its radio number."""
+        radio_nr = self.sender().radio_nr
+        self.states[radio_nr]["online"] = online
+        self.onlineChanged.emit(radio_nr, online)
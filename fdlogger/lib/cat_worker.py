@@ -0,0 +1,191 @@
+"""Polls the radio on its own thread"""
+
+import logging
+import queue
+import threading
+import time
+
+from PyQt5 import QtCore
+
+from .cat_interface import CAT
+
+
+class PollScheduler:
+    """
+    Decides how long to wait before polling the radio again.
+
+    Right after the radio changed, or while it's transmitting, it's polled
+    every fast seconds. Each poll that finds nothing new waits growth times
+    longer, up to idle seconds. While the radio doesn't answer, the wait
+    starts at offline_first seconds and doubles up to offline_max, which
+    also spaces out the reconnect attempts.
+    """
+
+    def __init__(
+        self,
+        fast: float = 0.15,
+        idle: float = 3.0,
+        growth: float = 1.5,
+        offline_first: float = 1.0,
+        offline_max: float = 30.0,
+    ) -> None:
+        self.fast = fast
+        self.idle = idle
+        self.growth = growth
+        self.offline_first = offline_first
+        self.offline_max = offline_max
+        self.interval = fast
+        self.offline = None
+
+    def wake(self) -> None:
+        """Goes back to polling fast, say after a command was sent."""
+        self.interval = self.fast
+        self.offline = None
+
+    def next_interval(self, online: bool, changed: bool, transmitting: bool) -> float:
+        """Returns the seconds to wait after a poll with this outcome."""
+        if not online:
+            if self.offline is None:
+                self.offline = self.offline_first
+            else:
+                self.offline = min(self.offline * 2, self.offline_max)
+            return self.offline
+        self.offline = None
+        if changed or transmitting:
+            self.interval = self.fast
+        else:
+            self.interval = min(self.interval * self.growth, self.idle)
+        return self.interval
+
+
+class CATWorker(QtCore.QObject):  # pylint: disable=too-many-instance-attributes
+    """
+    Owns a CAT connection on a worker thread so a slow or hung radio never
+    holds up the GUI.
+
+    A PollScheduler sets how often the radio is polled. radioChanged(vfo, mode) and
+    pttChanged(transmitting) are only emitted when something changed, and
+    onlineChanged(online) when the radio stops or starts answering.
+
+    set_vfo(), set_mode(), set_power() and sendcw() queue the command for
+    the worker and return at once. The radio is polled again right after.
+    """
+
+    radioChanged = QtCore.pyqtSignal(str, str)
+    pttChanged = QtCore.pyqtSignal(bool)
+    onlineChanged = QtCore.pyqtSignal(bool)
+
+    def __init__(
+        self,
+        interface: str,
+        host: str,
+        port: int,
+        scheduler: PollScheduler = None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.logger = logging.getLogger("__name__")
+        self.interface = interface
+        self.host = host
+        self.port = port
+        self.scheduler = scheduler or PollScheduler()
+        self.cat = None
+        self.vfo = ""
+        self.mode = ""
+        self.ptt = False
+        self.online = None
+        self.commands = queue.Queue()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name=f"cat-{interface}", daemon=True
+        )
+
+    def start(self) -> None:
+        """Starts the worker thread."""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Asks the worker thread to finish. Doesn't wait for it."""
+        self.stopping.set()
+        self.commands.put(None)
+
+    def set_vfo(self, freq) -> None:
+        """Queues a frequency change."""
+        self.commands.put(("set_vfo", (freq,)))
+
+    def set_mode(self, mode: str) -> None:
+        """Queues a mode change."""
+        self.commands.put(("set_mode", (mode,)))
+
+    def set_power(self, power) -> None:
+        """Queues a power change."""
+        self.commands.put(("set_power", (power,)))
+
+    def sendcw(self, texttosend: str) -> None:
+        """Queues some CW for the radio to send."""
+        self.commands.put(("sendcw", (texttosend,)))
+
+    def run(self) -> None:
+        """
+        Runs queued commands and polls the radio until stopped, then closes
+        the connection to it.
+        """
+        self.cat = CAT(self.interface, self.host, self.port)
+        try:
+            next_poll = time.monotonic()
+            while not self.stopping.is_set():
+                try:
+                    command = self.commands.get(
+                        timeout=max(0.0, next_poll - time.monotonic())
+                    )
+                except queue.Empty:
+                    changed = self.poll()
+                    next_poll = time.monotonic() + self.scheduler.next_interval(
+                        bool(self.online), changed, self.ptt
+                    )
+                    continue
+                if command is None:
+                    continue
+                name, args = command
+                try:
+                    getattr(self.cat, name)(*args)
+                except Exception as exception:  # pylint: disable=broad-except
+                    self.logger.warning("CATWorker: %s %s", name, exception)
+                self.scheduler.wake()
+                next_poll = time.monotonic()
+        finally:
+            self.cat.close()
+
+    def poll(self) -> bool:
+        """
+        Reads vfo, mode and PTT, emitting whatever changed, and returns True
+        if anything did. If commands were queued meanwhile the reading is
+        already stale, so it's dropped.
+        """
+        try:
+            status = self.cat.get_status()
+            vfo = str(status.get("vfo", ""))
+            mode = str(status.get("mode", ""))
+            ptt = str(status.get("ptt", "")).strip() not in ("", "0")
+        except Exception as exception:  # pylint: disable=broad-except
+            self.logger.debug("CATWorker: poll %s", exception)
+            vfo, mode, ptt = "", "", False
+        if not self.commands.empty():
+            return True
+        changed = False
+        online = vfo != "" and mode != ""
+        if online != self.online:
+            self.online = online
+            self.onlineChanged.emit(online)
+            changed = True
+        if not online:
+            return changed
+        if vfo != self.vfo or mode != self.mode:
+            self.vfo, self.mode = vfo, mode
+            self.radioChanged.emit(vfo, mode)
+            changed = True
+        if ptt != self.ptt:
+            self.ptt = ptt
+            self.pttChanged.emit(ptt)
+            changed = True
+        return changed
@@ -0,0 +1,124 @@
+"""Circuit breaker for the callbook providers"""
+
+import logging
+import socket
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """
+    Wraps a callbook provider and stops asking it once it looks dead.
+
+    After failure_threshold lookups in a row fail on the network, or are
+    asked of a QRZ or HamQTH provider that never got a session, the
+    circuit opens and lookups return at once with an error instead of
+    waiting out a timeout. A background thread then tries to reach the
+    callbook's host, waiting longer between each try, logs in again if
+    need be, and closes the circuit once it answers with a session. The
+    online property tells the window which icon to show. Other attribute
+    reads fall through to the provider.
+    """
+
+    offline_text = "Callbook offline"
+    nosession_text = "Not logged in to the callbook"
+
+    def __init__(
+        self,
+        provider,
+        failure_threshold: int = 3,
+        first_backoff: float = 5.0,
+        max_backoff: float = 300.0,
+    ) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.provider = provider
+        self.name = type(provider).__name__
+        self.failure_threshold = failure_threshold
+        self.first_backoff = first_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.open = False
+        self.lock = threading.Lock()
+        self.closing = threading.Event()
+        self.prober = None
+        url = getattr(provider, "url", None) or getattr(provider, "qrzurl", "")
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+
+    def __getattr__(self, attribute):
+        return getattr(self.provider, attribute)
+
+    @property
+    def online(self) -> bool:
+        """False while the circuit is open."""
+        return not self.open
+
+    def lookup(self, call: str) -> tuple:
+        """Returns (grid, name, nickname, error_text), failing fast when open."""
+        if self.open:
+            return False, False, False, self.offline_text
+        if not self.logged_in():
+            self.failed("no session")
+            return False, False, False, self.nosession_text
+        try:
+            result = self.provider.lookup(call)
+        except requests.exceptions.RequestException as exception:
+            self.failed(exception)
+            return False, False, False, exception
+        if isinstance(result[3], Exception) or self.provider.error is True:
+            self.failed(result[3])
+        else:
+            with self.lock:
+                self.failures = 0
+        return result
+
+    def failed(self, reason) -> None:
+        """Counts a network failure, opening the circuit at the threshold."""
+        with self.lock:
+            self.failures += 1
+            self.logger.debug("CircuitBreaker: %s failure %s", self.name, reason)
+            if self.open or self.failures < self.failure_threshold:
+                return
+            self.open = True
+            self.logger.warning("CircuitBreaker: %s offline", self.name)
+            self.prober = threading.Thread(target=self.probe, daemon=True)
+            self.prober.start()
+
+    def logged_in(self) -> bool:
+        """False while a provider that needs a session key has none."""
+        if not hasattr(self.provider, "getsession"):
+            return True
+        return bool(getattr(self.provider, "session", True))
+
+    def reachable(self) -> bool:
+        """True if a TCP connection to the callbook's host can be made."""
+        if not self.host:
+            return False
+        try:
+            with socket.create_connection((self.host, self.port), timeout=3.0):
+                return True
+        except OSError:
+            return False
+
+    def probe(self) -> None:
+        """Waits for the callbook to come back, backing off between tries."""
+        backoff = self.first_backoff
+        while not self.closing.wait(backoff):
+            if self.reachable():
+                if not self.logged_in():
+                    self.provider.getsession()
+                if self.logged_in():
+                    with self.lock:
+                        self.failures = 0
+                        self.open = False
+                    self.logger.warning("CircuitBreaker: %s back online", self.name)
+                    return
+                self.logger.debug("CircuitBreaker: %s still not logged in", self.name)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def close(self) -> None:
+        """Stops the probe thread."""
+        self.closing.set()
@@ -1,17 +1,159 @@
 """Database class to store contacts"""
 import logging
 import sqlite3
+import threading
+from typing import NamedTuple, Optional
+
+
+class ContactStats(NamedTuple):
+    """Tallies returned by DataBase.contact_stats()"""
+
+    cwcontacts: int
+    phonecontacts: int
+    digitalcontacts: int
+    bandmodemult: int
+    last15: int
+    lasthour: int
+    highpower: bool
+    qrp: bool
+    cw_under_101: int
+    phone_under_101: int
+    digital_under_101: int
 
 
 class DataBase:
     """Database class for our database."""
 
+    # Each entry is (version, statements). Entries are applied in order to any
+    # database whose schema_version is below the entry's version, so existing
+    # logs are upgraded in place when they are opened. Only ever append here.
+    migrations = (
+        (
+            1,
+            (
+                "CREATE INDEX IF NOT EXISTS contacts_callsign "
+                "ON contacts (callsign COLLATE NOCASE);",
+                "CREATE INDEX IF NOT EXISTS contacts_band_mode "
+                "ON contacts (band, mode);",
+                "CREATE INDEX IF NOT EXISTS contacts_unique_id "
+                "ON contacts (unique_id);",
+                "CREATE INDEX IF NOT EXISTS contacts_dirty "
+                "ON contacts (dirty) WHERE dirty=1;",
+                "CREATE INDEX IF NOT EXISTS contacts_date_time "
+                "ON contacts (date_time);",
+            ),
+        ),
+    )
+
+    # Opt-in running tallies per band/mode, kept current by triggers on contacts
+    # so the stats panel, score and Statistics.txt never have to scan the log.
+    # over_qrp counts contacts above the QRP limit for their mode.
+    tally_schema = (
+        "CREATE TABLE IF NOT EXISTS contact_tallies "
+        "(band text NOT NULL, "
+        "mode text NOT NULL, "
+        "tally INTEGER NOT NULL DEFAULT 0, "
+        "max_power INTEGER, "
+        "under_101 INTEGER NOT NULL DEFAULT 0, "
+        "over_100 INTEGER NOT NULL DEFAULT 0, "
+        "over_qrp INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (band, mode)) WITHOUT ROWID;",
+        "CREATE TRIGGER IF NOT EXISTS contact_tallies_insert "
+        "AFTER INSERT ON contacts BEGIN "
+        "INSERT OR IGNORE INTO contact_tallies (band, mode) "
+        "VALUES (new.band, new.mode); "
+        "UPDATE contact_tallies SET "
+        "tally = tally + 1, "
+        "max_power = max(ifnull(max_power, new.power), new.power), "
+        "under_101 = under_101 + (new.power < 101), "
+        "over_100 = over_100 + (new.power > 100), "
+        "over_qrp = over_qrp + ((new.mode = 'CW' and new.power > 5) "
+        "or (new.mode in ('PH', 'DI') and new.power > 10)) "
+        "WHERE band = new.band AND mode = new.mode; "
+        "END;",
+        "CREATE TRIGGER IF NOT EXISTS contact_tallies_delete "
+        "AFTER DELETE ON contacts BEGIN "
+        "UPDATE contact_tallies SET "
+        "tally = tally - 1, "
+        "max_power = CASE WHEN old.power < max_power THEN max_power ELSE "
+        "(SELECT MAX(power) FROM contacts "
+        "WHERE band = old.band AND mode = old.mode) END, "
+        "under_101 = under_101 - (old.power < 101), "
+        "over_100 = over_100 - (old.power > 100), "
+        "over_qrp = over_qrp - ((old.mode = 'CW' and old.power > 5) "
+        "or (old.mode in ('PH', 'DI') and old.power > 10)) "
+        "WHERE band = old.band AND mode = old.mode; "
+        "DELETE FROM contact_tallies "
+        "WHERE band = old.band AND mode = old.mode AND tally <= 0; "
+        "END;",
+        "CREATE TRIGGER IF NOT EXISTS contact_tallies_update "
+        "AFTER UPDATE OF band, mode, power ON contacts BEGIN "
+        "UPDATE contact_tallies SET "
+        "tally = tally - 1, "
+        "max_power = (SELECT MAX(power) FROM contacts "
+        "WHERE band = old.band AND mode = old.mode), "
+        "under_101 = under_101 - (old.power < 101), "
+        "over_100 = over_100 - (old.power > 100), "
+        "over_qrp = over_qrp - ((old.mode = 'CW' and old.power > 5) "
+        "or (old.mode in ('PH', 'DI') and old.power > 10)) "
+        "WHERE band = old.band AND mode = old.mode; "
+        "DELETE FROM contact_tallies "
+        "WHERE band = old.band AND mode = old.mode AND tally <= 0; "
+        "INSERT OR IGNORE INTO contact_tallies (band, mode) "
+        "VALUES (new.band, new.mode); "
+        "UPDATE contact_tallies SET "
+        "tally = tally + 1, "
+        "max_power = max(ifnull(max_power, new.power), new.power), "
+        "under_101 = under_101 + (new.power < 101), "
+        "over_100 = over_100 + (new.power > 100), "
+        "over_qrp = over_qrp + ((new.mode = 'CW' and new.power > 5) "
+        "or (new.mode in ('PH', 'DI') and new.power > 10)) "
+        "WHERE band = new.band AND mode = new.mode; "
+        "END;",
+    )
+
+    tally_recount = (
+        "select band, mode, count(*), MAX(power), "
+        "sum(power < 101), sum(power > 100), "
+        "sum((mode = 'CW' and power > 5) or (mode in ('PH', 'DI') and power > 10)) "
+        "from contacts group by band, mode order by band, mode"
+    )
+
     def __init__(self, database):
         """initializes DataBase instance"""
         self.logger = logging.getLogger("__name__")
         self.database = database
+        self.conn = None
+        self.lock = threading.RLock()
+        self.tallies = False
         self.create_db()
 
+    def connect(self) -> sqlite3.Connection:
+        """
+        Returns the long lived connection to the database, opening it if needed.
+        The journal is put in WAL mode so readers are never blocked by the writer,
+        and fsyncs only happen at checkpoints.
+        """
+        with self.lock:
+            if self.conn is None:
+                self.conn = sqlite3.connect(self.database, check_same_thread=False)
+                self.conn.execute("PRAGMA journal_mode=WAL;")
+                self.conn.execute("PRAGMA synchronous=NORMAL;")
+                self.conn.execute("PRAGMA cache_size=-8192;")
+                self.conn.execute("PRAGMA temp_store=MEMORY;")
+            return self.conn
+
+    def close(self) -> None:
+        """Closes the connection, checkpointing the WAL back into the database."""
+        with self.lock:
+            if self.conn is not None:
+                try:
+                    self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+                    self.conn.close()
+                except sqlite3.Error as exception:
+                    self.logger.critical("DataBase close: %s", exception)
+                self.conn = None
+
     @staticmethod
     def row_factory(cursor, row):
         """
@@ -32,7 +174,7 @@ class DataBase:
         create database tables contacts if they do not exist.
         """
         try:
-            with sqlite3.connect(self.database) as conn:
+            with self.lock, self.connect() as conn:
                 cursor = conn.cursor()
                 sql_table = (
                     "CREATE TABLE IF NOT EXISTS contacts "
@@ -51,29 +193,150 @@ class DataBase:
                     "dirty INTEGER DEFAULT 1);"
                 )
                 cursor.execute(sql_table)
+                cursor.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_version "
+                    "(version INTEGER PRIMARY KEY, "
+                    "applied text NOT NULL);"
+                )
                 conn.commit()
         except sqlite3.Error as exception:
             self.logger.critical("%s", exception)
+        self.migrate()
+        self.tallies = self.has_tallies()
+
+    def schema_version(self) -> int:
+        """returns the highest migration applied to the database, 0 if none."""
+        with self.lock, self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("select MAX(version) from schema_version")
+            return cursor.fetchone()[0] or 0
+
+    def migrate(self) -> None:
+        """
+        Applies any migrations newer than the databases schema_version.
+        Each migration runs in its own transaction along with its version stamp,
+        so a failure leaves the database at the last good version.
+        """
+        try:
+            current = self.schema_version()
+            for version, statements in self.migrations:
+                if version <= current:
+                    continue
+                self.logger.info("DataBase migrate: %s -> %s", current, version)
+                with self.lock, self.connect() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("BEGIN;")
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, applied) "
+                        "VALUES (?, datetime('now'));",
+                        (version,),
+                    )
+                current = version
+        except sqlite3.Error as exception:
+            self.logger.critical("DataBase migrate: %s", exception)
+
+    def has_tallies(self) -> bool:
+        """returns True if the contact_tallies table and its triggers are installed."""
+        with self.lock, self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "select count(*) from sqlite_master "
+                "where name in ('contact_tallies', 'contact_tallies_insert', "
+                "'contact_tallies_delete', 'contact_tallies_update')"
+            )
+            return cursor.fetchone()[0] == 4
+
+    def enable_tallies(self) -> None:
+        """Installs the contact_tallies table and triggers, and fills it from the log."""
+        if self.tallies:
+            return
+        try:
+            with self.lock, self.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN;")
+                for statement in self.tally_schema:
+                    cursor.execute(statement)
+                cursor.execute("DELETE FROM contact_tallies;")
+                cursor.execute(
+                    "INSERT INTO contact_tallies "
+                    "(band, mode, tally, max_power, under_101, over_100, over_qrp) "
+                    + self.tally_recount
+                )
+            self.tallies = True
+        except sqlite3.Error as exception:
+            self.logger.critical("DataBase enable_tallies: %s", exception)
+
+    def disable_tallies(self) -> None:
+        """Removes the contact_tallies table and triggers."""
+        try:
+            with self.lock, self.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN;")
+                cursor.execute("DROP TRIGGER IF EXISTS contact_tallies_insert;")
+                cursor.execute("DROP TRIGGER IF EXISTS contact_tallies_delete;")
+                cursor.execute("DROP TRIGGER IF EXISTS contact_tallies_update;")
+                cursor.execute("DROP TABLE IF EXISTS contact_tallies;")
+            self.tallies = False
+        except sqlite3.Error as exception:
+            self.logger.critical("DataBase disable_tallies: %s", exception)
+
+    def rebuild_tallies(self) -> bool:
+        """
+        Recomputes contact_tallies from scratch.
+        Returns True if the running tallies already matched the log.
+        """
+        if not self.tallies:
+            return True
+        try:
+            with self.lock, self.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN;")
+                cursor.execute(
+                    "select band, mode, tally, max_power, under_101, over_100, over_qrp "
+                    "from contact_tallies order by band, mode"
+                )
+                running = cursor.fetchall()
+                cursor.execute(self.tally_recount)
+                recounted = cursor.fetchall()
+                cursor.execute("DELETE FROM contact_tallies;")
+                cursor.executemany(
+                    "INSERT INTO contact_tallies "
+                    "(band, mode, tally, max_power, under_101, over_100, over_qrp) "
+                    "VALUES (?,?,?,?,?,?,?)",
+                    recounted,
+                )
+        except sqlite3.Error as exception:
+            self.logger.critical("DataBase rebuild_tallies: %s", exception)
+            return False
+        if running != recounted:
+            self.logger.warning(
+                "DataBase rebuild_tallies: mismatch %s != %s", running, recounted
+            )
+            return False
+        return True
 
     def clear_dirty_flag(self, unique_id) -> None:
         """Clears the dirty flag."""
         if unique_id:
             try:
-                with sqlite3.connect(self.database) as conn:
-                    sql = f"update contacts set dirty=0 where unique_id='{unique_id}';"
+                with self.lock, self.connect() as conn:
+                    sql = "update contacts set dirty=0 where unique_id=?;"
                     cursor = conn.cursor()
-                    cursor.execute(sql)
+                    cursor.execute(sql, (unique_id,))
                     conn.commit()
             except sqlite3.Error as exception:
                 self.logger.critical("%s", exception)
 
-    def log_contact(self, logme: tuple) -> None:
+    def log_contact(self, logme: tuple) -> Optional[int]:
         """
-        Inserts a contact into the db.
+        Inserts a contact into the db, returning its id, or None if it
+        couldn't be saved.
         pass in (hiscall, hisclass, hissection, band, mode, int(power), grid, name)
         """
         try:
-            with sqlite3.connect(self.database) as conn:
+            with self.lock, self.connect() as conn:
                 sql = (
                     "INSERT INTO contacts"
                     "(callsign, class, section, date_time, frequency, "
@@ -83,15 +346,17 @@ class DataBase:
                 cur = conn.cursor()
                 cur.execute(sql, logme)
                 conn.commit()
+                return cur.lastrowid
         except sqlite3.Error as exception:
             self.logger.debug("DataBase log_contact: %s", exception)
+        return None
 
     def get_unique_id(self, contact) -> str:
         """get unique id"""
         unique_id = ""
         if contact:
             try:
-                with sqlite3.connect(self.database) as conn:
+                with self.lock, self.connect() as conn:
                     sql = f"select unique_id from contacts where id={int(contact)}"
                     cursor = conn.cursor()
                     cursor.execute(sql)
@@ -104,7 +369,7 @@ class DataBase:
         """Deletes a contact from the db."""
         if contact:
             try:
-                with sqlite3.connect(self.database) as conn:
+                with self.lock, self.connect() as conn:
                     sql = f"delete from contacts where id={int(contact)}"
                     cur = conn.cursor()
                     cur.execute(sql)
@@ -115,7 +380,7 @@ class DataBase:
     def change_contact(self, qso):
         """Update an existing contact."""
         try:
-            with sqlite3.connect(self.database) as conn:
+            with self.lock, self.connect() as conn:
                 sql = (
                     f"update contacts set callsign = '{qso[0]}', class = '{qso[1]}', "
                     f"section = '{qso[2]}', date_time = '{qso[3]}', band = '{qso[4]}', "
@@ -128,147 +393,124 @@ class DataBase:
         except sqlite3.Error as exception:
             self.logger.critical("DataBase change_contact: %s", exception)
 
-    def stats(self) -> tuple:
+    def change_contact_lookup(self, contact_id, grid: str, name: str) -> None:
         """
-        returns a tuple with some stats:
-        cwcontacts, phonecontacts, digitalcontacts, bandmodemult, last15, lasthour, hignpower, qrp
+        Fills in a contact's grid and name once a callbook lookup comes back,
+        leaving any that already have a value alone.
         """
-        with sqlite3.connect(self.database) as conn:
-            cursor = conn.cursor()
-            cursor.execute("select count(*) from contacts where mode = 'CW'")
-            cwcontacts = str(cursor.fetchone()[0])
-            cursor.execute("select count(*) from contacts where mode = 'PH'")
-            phonecontacts = str(cursor.fetchone()[0])
-            cursor.execute("select count(*) from contacts where mode = 'DI'")
-            digitalcontacts = str(cursor.fetchone()[0])
-            cursor.execute("select distinct band, mode from contacts")
-            bandmodemult = len(cursor.fetchall())
-            cursor.execute(
-                "SELECT count(*) FROM contacts "
-                "where datetime(date_time) >=datetime('now', '-15 Minutes')"
-            )
-            last15 = str(cursor.fetchone()[0])
-            cursor.execute(
-                "SELECT count(*) FROM contacts "
-                "where datetime(date_time) >=datetime('now', '-1 Hours')"
-            )
-            lasthour = str(cursor.fetchone()[0])
-            cursor.execute(
-                "select count(*) as qrpc from contacts where mode = 'CW' and power > 5"
-            )
-            log = cursor.fetchall()
-            qrpc = list(log[0])[0]
-            cursor.execute(
-                "select count(*) as qrpp from contacts where mode = 'PH' and power > 10"
-            )
-            log = cursor.fetchall()
-            qrpp = list(log[0])[0]
-            cursor.execute(
-                "select count(*) as qrpd from contacts where mode = 'DI' and power > 10"
-            )
-            log = cursor.fetchall()
-            qrpd = list(log[0])[0]
-            cursor.execute(
-                "select count(*) as highpower from contacts where power > 100"
-            )
-            log = cursor.fetchall()
-            highpower = bool(list(log[0])[0])
-            qrp = not qrpc + qrpp + qrpd
-
-            return (
-                cwcontacts,
-                phonecontacts,
-                digitalcontacts,
-                bandmodemult,
-                last15,
-                lasthour,
-                highpower,
-                qrp,
-            )
-
-    def contacts_under_101watts(self) -> tuple:
-        """return contact tallies for contacts made below 101 watts."""
         try:
-            with sqlite3.connect(self.database) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "select count(*) as cw from contacts where mode = 'CW' and power < 101"
+            with self.lock, self.connect() as conn:
+                conn.execute(
+                    "update contacts set grid = coalesce(nullif(grid, ''), ?), "
+                    "opname = coalesce(nullif(opname, ''), ?) where id = ?;",
+                    (grid or "", name or "", int(contact_id)),
                 )
-                c_dubs = str(cursor.fetchone()[0])
-                cursor.execute(
-                    "select count(*) as ph from contacts where mode = 'PH' and power < 101"
-                )
-                phone = str(cursor.fetchone()[0])
-                cursor.execute(
-                    "select count(*) as di from contacts where mode = 'DI' and power < 101"
-                )
-                digital = str(cursor.fetchone()[0])
+                conn.commit()
         except sqlite3.Error as exception:
-            self.logger.critical("DB-contacts_under_101watts: %s", exception)
-            return 0, 0, 0
-        return c_dubs, phone, digital
+            self.logger.critical("DataBase change_contact_lookup: %s", exception)
 
-    def qrp_check(self) -> tuple:
-        """check to see if all contacts were QRP"""
+    def contact_stats(self) -> ContactStats:
+        """
+        Returns every tally needed for the stats panel, the score and the
+        cabrillo power category, gathered in a single pass over the contacts,
+        or read straight from contact_tallies when those are enabled.
+        """
         try:
-            with sqlite3.connect(self.database) as conn:
+            with self.lock, self.connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "select count(*) as qrpc from contacts where mode = 'CW' and power > 5"
-                )
-                log = cursor.fetchall()
-                qrpc = list(log[0])[0]
-                cursor.execute(
-                    "select count(*) as qrpp from contacts where mode = 'PH' and power > 10"
-                )
-                log = cursor.fetchall()
-                qrpp = list(log[0])[0]
-                cursor.execute(
-                    "select count(*) as qrpd from contacts where mode = 'DI' and power > 10"
-                )
-                log = cursor.fetchall()
-                qrpd = list(log[0])[0]
-                cursor.execute(
-                    "select count(*) as highpower from contacts where power > 100"
-                )
-                log = cursor.fetchall()
-                highpower = bool(list(log[0])[0])
-                qrp = not qrpc + qrpp + qrpd
+                if self.tallies:
+                    cursor.execute(
+                        "select "
+                        "ifnull(sum(case when mode = 'CW' then tally end), 0), "
+                        "ifnull(sum(case when mode = 'PH' then tally end), 0), "
+                        "ifnull(sum(case when mode = 'DI' then tally end), 0), "
+                        "count(*), "
+                        "(select count(*) from contacts "
+                        "where date_time >= datetime('now', '-15 Minutes')), "
+                        "(select count(*) from contacts "
+                        "where date_time >= datetime('now', '-1 Hours')), "
+                        "ifnull(sum(over_100), 0), "
+                        "ifnull(sum(over_qrp), 0), "
+                        "ifnull(sum(case when mode = 'CW' then under_101 end), 0), "
+                        "ifnull(sum(case when mode = 'PH' then under_101 end), 0), "
+                        "ifnull(sum(case when mode = 'DI' then under_101 end), 0) "
+                        "from contact_tallies"
+                    )
+                else:
+                    cursor.execute(
+                        "select "
+                        "ifnull(sum(mode = 'CW'), 0), "
+                        "ifnull(sum(mode = 'PH'), 0), "
+                        "ifnull(sum(mode = 'DI'), 0), "
+                        "count(distinct band || ' ' || mode), "
+                        "ifnull(sum(date_time >= datetime('now', '-15 Minutes')), 0), "
+                        "ifnull(sum(date_time >= datetime('now', '-1 Hours')), 0), "
+                        "ifnull(sum(power > 100), 0), "
+                        "ifnull(sum((mode = 'CW' and power > 5) "
+                        "or (mode in ('PH', 'DI') and power > 10)), 0), "
+                        "ifnull(sum(mode = 'CW' and power < 101), 0), "
+                        "ifnull(sum(mode = 'PH' and power < 101), 0), "
+                        "ifnull(sum(mode = 'DI' and power < 101), 0) "
+                        "from contacts"
+                    )
+                (
+                    cwcontacts,
+                    phonecontacts,
+                    digitalcontacts,
+                    bandmodemult,
+                    last15,
+                    lasthour,
+                    highpower,
+                    notqrp,
+                    cw_under_101,
+                    phone_under_101,
+                    digital_under_101,
+                ) = cursor.fetchone()
         except sqlite3.Error as exception:
-            self.logger.critical("qrpcheck: %s", exception)
-            return 0, 0
-        return qrp, highpower
+            self.logger.critical("DataBase contact_stats: %s", exception)
+            return ContactStats(0, 0, 0, 0, 0, 0, False, False, 0, 0, 0)
+        return ContactStats(
+            cwcontacts,
+            phonecontacts,
+            digitalcontacts,
+            bandmodemult,
+            last15,
+            lasthour,
+            bool(highpower),
+            not notqrp,
+            cw_under_101,
+            phone_under_101,
+            digital_under_101,
+        )
 
-    def get_band_mode_tally(self, band, mode):
+    def fetch_band_mode_tallies(self) -> dict:
         """
-        returns the amount of contacts and the maximum power used
-        for a given band using a particular mode.
+        returns a dict keyed by (band, mode) of (contacts, maximum power),
+        for every band/mode combination worked.
         """
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "select count(*) as tally, MAX(power) as mpow from contacts "
-                f"where band = '{band}' AND mode ='{mode}'"
-            )
-            return cursor.fetchone()
-
-    def get_bands(self) -> tuple:
-        """returns a list of bands"""
-        with sqlite3.connect(self.database) as conn:
-            cursor = conn.cursor()
-            cursor.execute("select DISTINCT band from contacts")
-            return cursor.fetchall()
+            if self.tallies:
+                cursor.execute(
+                    "select band, mode, tally, max_power from contact_tallies"
+                )
+            else:
+                cursor.execute(
+                    "select band, mode, count(*), MAX(power) from contacts "
+                    "group by band, mode"
+                )
+            return {(band, mode): (tally, mpow) for band, mode, tally, mpow in cursor}
 
     def fetch_all_contacts_asc(self) -> tuple:
         """returns a tuple of all contacts in the database."""
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute("select * from contacts order by date_time ASC")
             return cursor.fetchall()
 
     def fetch_all_contacts_desc(self) -> tuple:
         """returns a tuple of all contacts in the database."""
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute("select * from contacts order by date_time desc")
             return cursor.fetchall()
@@ -284,9 +526,9 @@ class DataBase:
             'unique_id': '6fe98693f3ac4250847a6e5ac9da650e', 'dirty': 1\n
         }\n
         """
-        with sqlite3.connect(self.database) as conn:
-            conn.row_factory = self.row_factory
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = self.row_factory
             cursor.execute("select * from contacts where dirty=1 order by id")
             return cursor.fetchall()
 
@@ -295,46 +537,99 @@ class DataBase:
         Returns a dict containing the count of contacts still flagged as dirty.\n
         Example: {'alldirty': 3}
         """
-        with sqlite3.connect(self.database) as conn:
-            conn.row_factory = self.row_factory
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = self.row_factory
             cursor.execute("select count(*) as alldirty from contacts where dirty=1")
             return cursor.fetchone()
 
     def fetch_last_contact(self) -> tuple:
         """returns a tuple of all contacts in the database."""
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute("select * from contacts order by id desc")
             return cursor.fetchone()
 
     def dup_check(self, acall: str) -> tuple:
         """returns a list of possible dups"""
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "select callsign, class, section, band, mode "
-                f"from contacts where callsign like '{acall}' order by band"
+                "from contacts where callsign like ? order by band",
+                (acall,),
+            )
+            return cursor.fetchall()
+
+    def fetch_all_dupe_rows(self) -> tuple:
+        """
+        returns (callsign, class, section, band, mode, date_time) for every
+        contact, oldest first, for loading the dupe index.
+        """
+        with self.lock, self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "select callsign, class, section, band, mode, date_time "
+                "from contacts order by date_time"
             )
             return cursor.fetchall()
 
     def sections(self) -> tuple:
         """returns a list of sections worked."""
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute("select distinct section from contacts")
             return cursor.fetchall()
 
     def contact_by_id(self, record) -> tuple:
         """returns a contact matching an id"""
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("select * from contacts where id=" + record)
+            cursor.execute("select * from contacts where id=?", (int(record),))
+            return cursor.fetchall()
+
+    def fetch_contact(self, record) -> dict:
+        """
+        Returns the contact matching an id as a dict, or None.
+        Same layout as fetch_all_dirty_contacts.
+        """
+        with self.lock, self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = self.row_factory
+            cursor.execute("select * from contacts where id=?", (int(record),))
+            return cursor.fetchone()
+
+    def count_contacts(self) -> int:
+        """returns the number of contacts in the log."""
+        with self.lock, self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("select count(*) from contacts")
+            return cursor.fetchone()[0]
+
+    def fetch_contacts_page(self, after=None, limit=200) -> list:
+        """
+        Returns up to limit contacts, newest first, starting after the
+        (date_time, id) of the last contact of the previous page.
+        Walks the date_time index, so each page costs the same however deep it is.
+        """
+        with self.lock, self.connect() as conn:
+            cursor = conn.cursor()
+            if after is None:
+                cursor.execute(
+                    "select * from contacts order by date_time desc, id desc limit ?",
+                    (limit,),
+                )
+            else:
+                cursor.execute(
+                    "select * from contacts where (date_time, id) < (?, ?) "
+                    "order by date_time desc, id desc limit ?",
+                    (after[0], after[1], limit),
+                )
             return cursor.fetchall()
 
     def get_grids(self) -> tuple:
         """returns a tuple of unique grids in the log."""
-        with sqlite3.connect(self.database) as conn:
+        with self.lock, self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute("select DISTINCT grid from contacts")
             return cursor.fetchall()
@@ -0,0 +1,99 @@
+"""In memory dupe index of the callsigns in the log."""
+
+import logging
+import time
+from collections import Counter
+
+
+class DupeIndex:
+    """
+    Keeps the band/mode combinations each callsign has been worked on,
+    so dupe checks never have to go to the database.
+
+    Load it once from the log with load(), then keep it current with
+    add() and remove() as contacts are logged, edited and deleted. Each
+    call's exchanges are kept with their contact's date_time, so
+    last_exchange() follows the log's time order whatever order contacts
+    were added or edited in.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.worked = {}
+        self.exchanges = {}
+
+    def load(self, contacts) -> None:
+        """
+        Rebuilds the index from an iterable of
+        (callsign, class, section, band, mode, date_time).
+        """
+        self.worked = {}
+        self.exchanges = {}
+        for contact in contacts:
+            self.add(contact)
+        self.logger.debug("DupeIndex: loaded %s calls", len(self.worked))
+
+    def add(self, contact: tuple) -> None:
+        """
+        Adds a logged contact, (callsign, class, section, band, mode) and
+        optionally its "YYYY-MM-DD HH:MM:SS" UTC date_time as the database
+        keeps it, to the index. Without a date_time it's taken as now.
+        """
+        callsign, hisclass, hissection, band, mode, *date_time = contact
+        callsign = callsign.upper()
+        if not date_time:
+            date_time = [time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())]
+        self.worked.setdefault(callsign, Counter())[(str(band), mode)] += 1
+        self.exchanges.setdefault(callsign, []).append(
+            (date_time[0], str(band), mode, hisclass, hissection)
+        )
+
+    def remove(self, contact: tuple) -> None:
+        """
+        Removes a contact that was edited or deleted from the index, given
+        as (callsign, class, section, band, mode, date_time) so the right
+        one of the call's contacts is dropped.
+        """
+        callsign, hisclass, hissection, band, mode, date_time = contact
+        callsign = callsign.upper()
+        bands = self.worked.get(callsign)
+        if not bands:
+            return
+        key = (str(band), mode)
+        bands[key] -= 1
+        if bands[key] <= 0:
+            del bands[key]
+        exchanges = self.exchanges.get(callsign, [])
+        wanted = (date_time, str(band), mode, hisclass, hissection)
+        for index in range(len(exchanges) - 1, -1, -1):
+            if exchanges[index] == wanted:
+                del exchanges[index]
+                break
+        else:
+            # Not an exact match, drop the latest contact on that band and mode.
+            for index in range(len(exchanges) - 1, -1, -1):
+                if exchanges[index][1:3] == key:
+                    del exchanges[index]
+                    break
+        if not bands:
+            del self.worked[callsign]
+            self.exchanges.pop(callsign, None)
+
+    def is_dupe(self, callsign: str, band, mode) -> bool:
+        """Returns True if callsign has already been worked on band and mode."""
+        bands = self.worked.get(callsign.upper())
+        return bool(bands) and (str(band), mode) in bands
+
+    def bands_worked(self, callsign: str) -> list:
+        """Returns a sorted list of the (band, mode) callsign has been worked on."""
+        return sorted(self.worked.get(callsign.upper(), ()))
+
+    def last_exchange(self, callsign: str):
+        """Returns the (class, section) of callsign's latest contact, or None."""
+        exchanges = self.exchanges.get(callsign.upper())
+        if not exchanges:
+            return None
+        latest = max(
+            range(len(exchanges)), key=lambda index: (exchanges[index][0], index)
+        )
+        return exchanges[latest][3:]
@@ -0,0 +1,78 @@
+"""Shared HTTP session for the callbook and Cloudlog clients"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger("__name__")
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+RETRIES = 2
+BACKOFF = 0.5
+POOL_SIZE = 4
+
+_shared = {"session": None}
+_shared_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests made without one."""
+
+    def __init__(self, *args, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, *args, **kwargs)
+
+
+def make_session(
+    connect_timeout: float = CONNECT_TIMEOUT,
+    read_timeout: float = READ_TIMEOUT,
+    retries: int = RETRIES,
+    pool_size: int = POOL_SIZE,
+) -> requests.Session:
+    """
+    Returns a requests.Session that keeps connections to each host alive,
+    so repeat lookups skip the TCP and TLS handshakes.
+
+    Failed connects and 502/503/504 answers to GETs are retried with
+    backoff. Read errors aren't retried: a server that stopped answering
+    would hold a lookup for several read timeouts, and a Cloudlog QSO
+    must never be sent twice.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=False,
+        status=retries,
+        backoff_factor=BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(("GET", "HEAD")),
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=(connect_timeout, read_timeout),
+        max_retries=retry,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def http_session() -> requests.Session:
+    """Returns the session shared by the whole logger, creating it on first use."""
+    with _shared_lock:
+        if _shared["session"] is None:
+            _shared["session"] = make_session()
+            logger.debug("http_client: session created")
+        return _shared["session"]
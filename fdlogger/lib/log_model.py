@@ -0,0 +1,184 @@
+"""Table model backing the log window"""
+
+import logging
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt
+
+
+class ContactLogModel(QtCore.QAbstractTableModel):
+    """
+    Presents the contacts table newest first.
+
+    Rows are fetched from the database a page at a time as the view scrolls,
+    and logging, editing or deleting a contact only touches the affected row.
+    """
+
+    headers = ("#", "Call", "Class", "Sect", "Date Time", "Freq", "Band", "Mode", "Pwr")
+    page_size = 200
+
+    def __init__(self, database, parent=None) -> None:
+        super().__init__(parent)
+        self.logger = logging.getLogger("__name__")
+        self.database = database
+        self.contacts = []
+        self.total = 0
+
+    @staticmethod
+    def sort_key(contact) -> tuple:
+        """The (date_time, id) a contact is ordered by."""
+        return contact[4], contact[0]
+
+    def reload(self) -> None:
+        """Throws away the loaded rows and starts over from the newest contact."""
+        self.beginResetModel()
+        self.contacts = []
+        self.total = self.database.count_contacts()
+        self.endResetModel()
+        if self.canFetchMore(QtCore.QModelIndex()):
+            self.fetchMore(QtCore.QModelIndex())
+
+    def rowCount(self, parent=QtCore.QModelIndex()):  # pylint: disable=invalid-name
+        """Number of rows loaded so far."""
+        if parent.isValid():
+            return 0
+        return len(self.contacts)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):  # pylint: disable=invalid-name
+        """Number of columns."""
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def headerData(
+        self, section, orientation, role=Qt.DisplayRole
+    ):  # pylint: disable=invalid-name
+        """Column titles."""
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        """The text shown for a cell."""
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            if index.column() in (0, 5, 6, 8):
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+        (
+            logid,
+            hiscall,
+            hisclass,
+            hissection,
+            the_datetime,
+            frequency,
+            band,
+            mode,
+            power,
+            _,
+            _,
+            _,
+            _,
+        ) = self.contacts[index.row()]
+        return (
+            str(logid).rjust(3, "0"),
+            hiscall,
+            hisclass,
+            hissection,
+            the_datetime,
+            str(frequency),
+            f"{band}M",
+            mode,
+            f"{power}W",
+        )[index.column()]
+
+    def canFetchMore(self, parent):  # pylint: disable=invalid-name
+        """True while there are older contacts not yet loaded."""
+        if parent.isValid():
+            return False
+        return len(self.contacts) < self.total
+
+    def fetchMore(self, parent):  # pylint: disable=invalid-name
+        """Loads the next page of older contacts."""
+        if parent.isValid():
+            return
+        after = self.sort_key(self.contacts[-1]) if self.contacts else None
+        page = self.database.fetch_contacts_page(after, self.page_size)
+        if not page:
+            self.total = len(self.contacts)
+            return
+        first = len(self.contacts)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(page) - 1)
+        self.contacts.extend(page)
+        self.endInsertRows()
+
+    def contact_id(self, row: int) -> int:
+        """Returns the database id of the contact shown on a row."""
+        return self.contacts[row][0]
+
+    def row_of(self, contact_id: int) -> int:
+        """Returns the row a loaded contact is on, or -1."""
+        for row, contact in enumerate(self.contacts):
+            if contact[0] == contact_id:
+                return row
+        return -1
+
+    def position_for(self, key: tuple) -> int:
+        """Binary search for the row a contact with this sort key belongs on."""
+        low, high = 0, len(self.contacts)
+        while low < high:
+            middle = (low + high) // 2
+            if self.sort_key(self.contacts[middle]) > key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def insert_contact(self, contact_id) -> None:
+        """Adds a newly logged contact to the view."""
+        if contact_id is None:
+            return
+        found = self.database.contact_by_id(contact_id)
+        if not found:
+            return
+        contact = found[0]
+        unloaded = self.canFetchMore(QtCore.QModelIndex())
+        self.total += 1
+        row = self.position_for(self.sort_key(contact))
+        if row == len(self.contacts) and unloaded:
+            return  # Older than anything loaded, fetchMore will get to it.
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.contacts.insert(row, contact)
+        self.endInsertRows()
+
+    def remove_contact(self, contact_id) -> None:
+        """Removes a deleted contact from the view."""
+        self.total = max(self.total - 1, 0)
+        row = self.row_of(contact_id)
+        if row == -1:
+            return
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.contacts[row]
+        self.endRemoveRows()
+
+    def refresh_contact(self, contact_id) -> None:
+        """Re-reads an edited contact, moving it if its time was changed."""
+        row = self.row_of(contact_id)
+        found = self.database.contact_by_id(contact_id)
+        if row == -1 or not found:
+            return
+        contact = found[0]
+        if self.sort_key(contact) == self.sort_key(self.contacts[row]):
+            self.contacts[row] = contact
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, len(self.headers) - 1)
+            )
+            return
+        self.total -= 1
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.contacts[row]
+        self.endRemoveRows()
+        self.insert_contact(contact_id)
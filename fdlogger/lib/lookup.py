@@ -3,12 +3,54 @@ callsign lookup classes for:
 QRZ
 HamDB
 HamQTH
+a local callbook database
 """
 
 import logging
-import xmltodict
+import sqlite3
+import threading
+from pathlib import Path
+from xml.etree import ElementTree
+
 import requests
 
+from .http_client import http_session
+
+logger = logging.getLogger("__name__")
+
+
+def xml_fields(text: str, wanted: dict) -> dict:
+    """
+    Pulls just the wanted fields out of a callbook's XML reply.
+
+    wanted maps a section to the fields wanted from it, for example
+    {"callsign": {"grid", "name"}, "session": {"key"}}. Names are matched
+    lowercased with any namespace dropped, so QRZ's <Callsign> and HamDB's
+    <callsign> are both "callsign". Returns {section: {field: text}} for the
+    sections found.
+
+    The reply is read with a pull parser, and each section is thrown away
+    as soon as its fields are copied, so no document tree is ever built.
+    """
+    found = {}
+    parser = ElementTree.XMLPullParser(events=("end",))
+    try:
+        parser.feed(text)
+        for _, element in parser.read_events():
+            section = element.tag.rpartition("}")[2].lower()
+            fields = wanted.get(section)
+            if fields is None:
+                continue
+            values = found.setdefault(section, {})
+            for child in element:
+                field = child.tag.rpartition("}")[2].lower()
+                if field in fields:
+                    values[field] = child.text or ""
+            element.clear()
+    except ElementTree.ParseError as exception:
+        logger.debug("xml_fields: %s", exception)
+    return found
+
 
 class HamDBlookup:
     """
@@ -19,6 +61,10 @@ class HamDBlookup:
         self.logger = logging.getLogger("__name__")
         self.url = "https://api.hamdb.org/"
         self.error = False
+        self.fields = {
+            "callsign": {"call", "grid", "fname", "name", "nickname"},
+            "messages": {"status"},
+        }
 
     def lookup(self, call: str) -> tuple:
         """
@@ -58,19 +104,17 @@ class HamDBlookup:
 
         try:
             self.error = False
-            query_result = requests.get(
+            query_result = http_session().get(
                 self.url + call + "/xml/wfd_logger", timeout=10.0
             )
-        except requests.exceptions.Timeout as exception:
+        except requests.exceptions.RequestException as exception:
             self.error = True
             return grid, name, nickname, exception
         if query_result.status_code == 200:
             self.error = False
-            rootdict = xmltodict.parse(query_result.text)
-            root = rootdict.get("hamdb")
-            if root:
-                messages = root.get("messages")
-                callsign = root.get("callsign")
+            fields = xml_fields(query_result.text, self.fields)
+            messages = fields.get("messages")
+            callsign = fields.get("callsign")
             if messages:
                 error_text = messages.get("status")
                 self.logger.debug("HamDB: %s", error_text)
@@ -99,9 +143,12 @@ class HamDBlookup:
 class QRZlookup:
     """
     Class manages QRZ lookups. Pass in a username and password at instantiation.
+    Pass connect=False to call getsession() yourself, say from another thread.
     """
 
-    def __init__(self, username: str, password: str) -> None:
+    session_ttl = 86400
+
+    def __init__(self, username: str, password: str, connect: bool = True) -> None:
         self.logger = logging.getLogger("__name__")
         self.session = False
         self.expiration = False
@@ -111,9 +158,14 @@ class QRZlookup:
         self.username = username
         self.password = password
         self.qrzurl = "https://xmldata.qrz.com/xml/134/"
+        self.fields = {
+            "callsign": {"call", "grid", "fname", "name", "nickname"},
+            "session": {"key", "subexp", "error", "message"},
+        }
         self.message = False
         self.lastresult = False
-        self.getsession()
+        if connect:
+            self.getsession()
 
     def getsession(self) -> None:
         """
@@ -147,20 +199,17 @@ class QRZlookup:
         self.session = False
         try:
             payload = {"username": self.username, "password": self.password}
-            query_result = requests.get(self.qrzurl, params=payload, timeout=10.0)
-            baseroot = xmltodict.parse(query_result.text)
-            root = baseroot.get("QRZDatabase")
-            if root:
-                session = root.get("Session")
-            self.logger.debug("\n\n%s\n\n", root)
-            if session.get("Key"):
-                self.session = session.get("Key")
-            if session.get("SubExp"):
-                self.expiration = session.get("SubExp")
-            if session.get("Error"):
-                self.error = session.get("Error")
-            if session.get("Message"):
-                self.message = session.get("Message")
+            query_result = http_session().get(self.qrzurl, params=payload, timeout=10.0)
+            session = xml_fields(query_result.text, self.fields).get("session", {})
+            self.logger.debug("\n\n%s\n\n", session)
+            if session.get("key"):
+                self.session = session.get("key")
+            if session.get("subexp"):
+                self.expiration = session.get("subexp")
+            if session.get("error"):
+                self.error = session.get("error")
+            if session.get("message"):
+                self.message = session.get("message")
             self.logger.debug(
                 "key:%s error:%s message:%s",
                 self.session,
@@ -184,30 +233,32 @@ class QRZlookup:
         if self.session:
             payload = {"s": self.session, "callsign": call}
             try:
-                query_result = requests.get(self.qrzurl, params=payload, timeout=10.0)
-            except requests.exceptions.Timeout as exception:
+                query_result = http_session().get(
+                    self.qrzurl, params=payload, timeout=10.0
+                )
+            except requests.exceptions.RequestException as exception:
                 self.error = True
                 return grid, name, nickname, exception
-            baseroot = xmltodict.parse(query_result.text)
-            root = baseroot.get("QRZDatabase")
-            self.logger.debug("\n\n%s\n\n", root)
-            session = root.get("Session")
-            if not session.get("Key"):  # key expired get a new one
+            fields = xml_fields(query_result.text, self.fields)
+            self.logger.debug("\n\n%s\n\n", fields)
+            if not fields.get("session", {}).get("key"):  # key expired get a new one
                 self.logger.debug("no key, getting new one.")
                 self.getsession()
                 if self.session:
                     payload = {"s": self.session, "callsign": call}
-                    query_result = requests.get(
+                    query_result = http_session().get(
                         self.qrzurl, params=payload, timeout=3.0
                     )
-            grid, name, nickname, error_text = self.parse_lookup(query_result)
+                    fields = None
+            grid, name, nickname, error_text = self.parse_lookup(query_result, fields)
         self.logger.debug("%s %s %s %s", grid, name, nickname, error_text)
         return grid, name, nickname, error_text
 
-    def parse_lookup(self, query_result):
+    def parse_lookup(self, query_result, fields=None):
         """
         Returns gridsquare and name for a callsign looked up by qrz or hamdb.
         Or False for both if none found or error.
+        Pass in fields if the reply has already been through xml_fields.
 
         <?xml version="1.0" encoding="utf-8"?>
         <QRZDatabase version="1.34" xmlns="http://xmldata.qrz.com">
@@ -272,13 +323,13 @@ class QRZlookup:
         error_text = False
         nickname = False
         if query_result.status_code == 200:
-            baseroot = xmltodict.parse(query_result.text)
-            root = baseroot.get("QRZDatabase")
-            session = root.get("Session")
-            callsign = root.get("Callsign")
-            self.logger.debug("\n\n%s\n\n", root)
-            if session.get("Error"):
-                error_text = session.get("Error")
+            if fields is None:
+                fields = xml_fields(query_result.text, self.fields)
+            session = fields.get("session", {})
+            callsign = fields.get("callsign")
+            self.logger.debug("\n\n%s\n\n", fields)
+            if session.get("error"):
+                error_text = session.get("error")
                 self.error = error_text
             if callsign:
                 if callsign.get("grid"):
@@ -297,9 +348,11 @@ class QRZlookup:
 
 
 class HamQTH:
-    """HamQTH lookup"""
+    """HamQTH lookup, connect=False leaves getsession() to the caller."""
 
-    def __init__(self, username: str, password: str) -> None:
+    session_ttl = 3600
+
+    def __init__(self, username: str, password: str, connect: bool = True) -> None:
         """initialize HamQTH lookup"""
         self.logger = logging.getLogger("__name__")
         self.username = username
@@ -307,7 +360,12 @@ class HamQTH:
         self.url = "https://www.hamqth.com/xml.php"
         self.session = False
         self.error = False
-        self.getsession()
+        self.fields = {
+            "search": {"callsign", "grid", "nick", "adr_name"},
+            "session": {"session_id", "error"},
+        }
+        if connect:
+            self.getsession()
 
     def getsession(self) -> None:
         """get a session key"""
@@ -316,14 +374,12 @@ class HamQTH:
         self.session = False
         payload = {"u": self.username, "p": self.password}
         try:
-            query_result = requests.get(self.url, params=payload, timeout=10.0)
-        except requests.exceptions.Timeout:
+            query_result = http_session().get(self.url, params=payload, timeout=10.0)
+        except requests.exceptions.RequestException:
             self.error = True
             return
         self.logger.debug("resultcode: %s", query_result.status_code)
-        baseroot = xmltodict.parse(query_result.text)
-        root = baseroot.get("HamQTH")
-        session = root.get("session")
+        session = xml_fields(query_result.text, self.fields).get("session")
         if session:
             if session.get("session_id"):
                 self.session = session.get("session_id")
@@ -339,13 +395,14 @@ class HamQTH:
         if self.session:
             payload = {"id": self.session, "callsign": call, "prg": "wfdlogger"}
             try:
-                query_result = requests.get(self.url, params=payload, timeout=10.0)
-            except requests.exceptions.Timeout as exception:
+                query_result = http_session().get(
+                    self.url, params=payload, timeout=10.0
+                )
+            except requests.exceptions.RequestException as exception:
                 self.error = True
                 return grid, name, nickname, exception
             self.logger.debug("resultcode: %s", query_result.status_code)
-            baseroot = xmltodict.parse(query_result.text)
-            root = baseroot.get("HamQTH")
+            root = xml_fields(query_result.text, self.fields)
             search = root.get("search")
             session = root.get("session")
             if not search:
@@ -356,9 +413,11 @@ class HamQTH:
                             return grid, name, nickname, error_text
                         if session.get("error") == "Session does not exist or expired":
                             self.getsession()
-                            query_result = requests.get(
+                            payload["id"] = self.session
+                            query_result = http_session().get(
                                 self.url, params=payload, timeout=10.0
                             )
+                            root = xml_fields(query_result.text, self.fields)
             grid, name, nickname, error_text = self.parse_lookup(root)
         self.logger.debug("%s %s %s %s", grid, name, nickname, error_text)
         return grid, name, nickname, error_text
@@ -367,6 +426,7 @@ class HamQTH:
         """
         Returns gridsquare and name for a callsign looked up by qrz or hamdb.
         Or False for both if none found or error.
+        Takes the sections returned by xml_fields.
         """
         grid, name, nickname, error_text = False, False, False, False
         session = root.get("session")
@@ -384,6 +444,64 @@ class HamQTH:
         return grid, name, nickname, error_text
 
 
+class LocalDBlookup:
+    """
+    Looks calls up in a local callbook database, for sites with no internet.
+    Build the database with: python -m fdlogger.lib.callbook_import
+    """
+
+    def __init__(self, database: str) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.database = database
+        self.error = False
+        self.online = True
+        self.session = False
+        self.conn = None
+        self.lock = threading.Lock()
+        try:
+            self.conn = sqlite3.connect(
+                f"{Path(database).resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+            )
+            self.conn.execute("select 1 from callsigns limit 1;")
+            self.session = True
+        except sqlite3.Error as exception:
+            self.error = f"{exception}"
+            self.logger.warning("LocalDBlookup: %s %s", database, exception)
+
+    def lookup(self, call: str) -> tuple:
+        """
+        Lookup a call in the local callbook
+        """
+        grid, name, nickname, error_text = False, False, False, False
+        if not self.session:
+            return grid, name, nickname, self.error
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "select name, grid from callsigns where call = ?;",
+                    (call.upper(),),
+                ).fetchone()
+        except sqlite3.Error as exception:
+            self.logger.debug("LocalDBlookup: %s", exception)
+            return grid, name, nickname, f"{exception}"
+        if row is None:
+            return grid, name, nickname, "Not found"
+        name = row[0] or False
+        grid = row[1] or False
+        self.logger.debug("%s %s %s %s", grid, name, nickname, error_text)
+        return grid, name, nickname, error_text
+
+    def close(self) -> None:
+        """Closes the database."""
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+                self.session = False
+
+
 def main():
     """Just in case..."""
     print("I'm not a program.")
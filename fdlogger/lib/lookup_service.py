@@ -0,0 +1,73 @@
+"""Runs callbook lookups on a small worker pool"""
+
+import logging
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from PyQt5 import QtCore
+
+
+class LookupService(QtCore.QObject):
+    """
+    Runs callbook lookups off the GUI thread.
+
+    At most max_workers lookups run at once. Asking for a call that is
+    already queued or running joins that lookup instead of starting another.
+    Results are delivered on the GUI thread through the lookupDone signal
+    as (call, (grid, name, nickname, error_text)). A lookup that raised is
+    delivered too, with the exception as its error_text.
+    """
+
+    lookupDone = QtCore.pyqtSignal(str, tuple)
+
+    def __init__(self, max_workers: int = 2, parent=None) -> None:
+        super().__init__(parent)
+        self.logger = logging.getLogger("__name__")
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="lookup"
+        )
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def lookup(self, call: str, provider):
+        """
+        Queues a lookup of call with provider, returning its Future.
+        Returns None if there's no provider.
+        """
+        if not provider or not call:
+            return None
+        call = call.upper()
+        with self.lock:
+            future = self.pending.get(call)
+            if future is not None and not future.cancelled():
+                return future
+            future = self.executor.submit(provider.lookup, call)
+            self.pending[call] = future
+        future.add_done_callback(lambda done: self.finished(call, done))
+        return future
+
+    def cancel(self, call: str) -> None:
+        """Drops a queued lookup of call that no one wants anymore."""
+        with self.lock:
+            future = self.pending.get(call.upper())
+        if future is not None:
+            future.cancel()
+
+    def finished(self, call: str, future) -> None:
+        """Clears the lookup from pending and hands its result to the GUI."""
+        with self.lock:
+            if self.pending.get(call) is future:
+                del self.pending[call]
+        try:
+            result = future.result()
+        except CancelledError:
+            self.logger.debug("LookupService: %s cancelled", call)
+            return
+        except Exception as exception:  # pylint: disable=broad-except
+            self.logger.warning("LookupService: %s %s", call, exception)
+            result = (False, False, False, str(exception))
+        self.lookupDone.emit(call, tuple(result))
+
+    def shutdown(self) -> None:
+        """Cancels anything queued and lets running lookups finish on their own."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,142 @@
+"""Client for hamlib's rigctld"""
+
+import logging
+import socket
+import time
+
+ERRORS = {
+    -1: "Invalid parameter",
+    -2: "Invalid configuration",
+    -3: "Memory shortage",
+    -4: "Feature not implemented",
+    -5: "Communication timed out",
+    -6: "IO error",
+    -7: "Internal Hamlib error",
+    -8: "Protocol error",
+    -9: "Command rejected by the rig",
+    -10: "Command performed, but arg truncated",
+    -11: "Feature not available",
+    -12: "Target VFO unaccessible",
+    -13: "Communication bus error",
+    -14: "Communication bus collision",
+    -15: "NULL RIG handle or invalid pointer parameter",
+    -16: "Invalid VFO",
+    -17: "Argument out of domain of func",
+}
+
+
+class RigctldError(Exception):
+    """rigctld answered a command with a non zero RPRT code."""
+
+    def __init__(self, command: str, code: int) -> None:
+        self.command = command
+        self.code = code
+        super().__init__(f"{command}: RPRT {code} {ERRORS.get(code, 'Unknown error')}")
+
+
+class RigctldClient:
+    """
+    Talks to rigctld in extended response mode, where every reply starts
+    with the name of the command it answers and ends with an RPRT line.
+
+    Replies are read through a line buffer, so it doesn't matter how
+    rigctld's bytes are split up or run together. Each reply is checked
+    against the command it should answer. A reply to the wrong command,
+    a closed connection or no whole reply within timeout seconds raises
+    an OSError and drops the connection, so the next command starts on a
+    fresh one instead of reading someone else's reply.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 0.5) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock = None
+        self.buffer = b""
+
+    @property
+    def connected(self) -> bool:
+        """True while there is a connection to rigctld."""
+        return self.sock is not None
+
+    def connect(self) -> None:
+        """Connects to rigctld, raising OSError if it can't."""
+        self.close()
+        self.sock = socket.create_connection((self.host, self.port), self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = b""
+        self.logger.debug("Connected to rigctld %s:%s", self.host, self.port)
+
+    def close(self) -> None:
+        """Drops the connection and anything left unread."""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.buffer = b""
+
+    def transact(self, *commands: str) -> list:
+        """
+        Sends commands, each a long command name and its arguments such as
+        "get_freq" or "set_mode USB 0", in one write. Returns a
+        (values, code) tuple for each, in the same order. Each reply gets
+        its own timeout seconds, counted from the end of the one before.
+        """
+        if self.sock is None:
+            self.connect()
+        request = "".join(f"+\\{command}\n" for command in commands)
+        try:
+            self.sock.sendall(request.encode())
+            return [
+                self.read_reply(command.split()[0], time.monotonic() + self.timeout)
+                for command in commands
+            ]
+        except OSError:
+            self.close()
+            raise
+
+    def query(self, command: str) -> list:
+        """Returns the values command answers with, or raises RigctldError."""
+        ((values, code),) = self.transact(command)
+        if code:
+            raise RigctldError(command, code)
+        return values
+
+    def read_line(self, deadline: float) -> str:
+        """Returns the next whole line, waiting no later than deadline."""
+        while b"\n" not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("rigctld didn't answer in time")
+            self.sock.settimeout(remaining)
+            data = self.sock.recv(4096)
+            if not data:
+                raise ConnectionResetError("rigctld closed the connection")
+            self.buffer += data
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return line.decode(errors="replace").strip()
+
+    def read_reply(self, name: str, deadline: float) -> tuple:
+        """Reads the reply to the command called name, returning (values, code)."""
+        header = self.read_line(deadline)
+        if header.startswith("RPRT"):
+            return [], self.rprt(header)
+        if header.split(":", 1)[0].strip() != name:
+            raise ConnectionError(f"expected a reply to {name}, got {header!r}")
+        values = []
+        while True:
+            line = self.read_line(deadline)
+            if line.startswith("RPRT"):
+                return values, self.rprt(line)
+            values.append(line.split(":", 1)[-1].strip())
+
+    @staticmethod
+    def rprt(line: str) -> int:
+        """Returns the code from an RPRT line."""
+        try:
+            return int(line.split()[1])
+        except (IndexError, ValueError):
+            return -8
@@ -0,0 +1,60 @@
+"""Keeps callbook session keys between runs"""
+
+import logging
+import time
+from json import dumps, loads
+
+
+class SessionStore:
+    """
+    Saves the session key a callbook handed out, so the next start can use
+    it instead of logging in again. Keys are kept per provider and username,
+    and forgotten after the provider's session_ttl seconds. A key the
+    callbook has already dropped does no harm, the provider logs in again
+    on its first lookup.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.filename = filename
+        self.sessions = {}
+        try:
+            with open(self.filename, "rt", encoding="utf-8") as file_descriptor:
+                self.sessions = loads(file_descriptor.read())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as exception:
+            self.logger.warning("SessionStore: %s", exception)
+
+    def restore(self, provider) -> bool:
+        """Gives provider its saved session key, returning True if there was one."""
+        saved = self.sessions.get(type(provider).__name__)
+        if (
+            not saved
+            or saved.get("username") != provider.username
+            or saved.get("expires", 0) < time.time()
+        ):
+            return False
+        provider.session = saved.get("session")
+        self.logger.debug("SessionStore: %s session restored", type(provider).__name__)
+        return bool(provider.session)
+
+    def save(self, provider) -> None:
+        """Remembers provider's current session key."""
+        name = type(provider).__name__
+        saved = self.sessions.get(name, {})
+        if saved.get("session", False) == provider.session:
+            return
+        if provider.session:
+            self.sessions[name] = {
+                "username": provider.username,
+                "session": provider.session,
+                "expires": time.time() + provider.session_ttl,
+            }
+        else:
+            self.sessions.pop(name, None)
+        try:
+            with open(self.filename, "wt", encoding="utf-8") as file_descriptor:
+                file_descriptor.write(dumps(self.sessions, indent=4))
+        except OSError as exception:
+            self.logger.warning("SessionStore: %s", exception)
@@ -33,6 +33,12 @@ class Settings(QtWidgets.QDialog):
             self.usehamqth_radioButton.setChecked(
                 bool(self.preference.get("usehamqth"))
             )
+            self.uselocaldb_radioButton.setChecked(
+                bool(self.preference.get("uselocaldb"))
+            )
+            self.localdb_field.setText(
+                str(self.preference.get("localdb", "callsigns.db"))
+            )
             self.lookup_user_name_field.setText(
                 str(self.preference.get("lookupusername", ""))
             )
@@ -86,6 +92,7 @@ class Settings(QtWidgets.QDialog):
                 str(self.preference.get("n1mm_lookupport", ""))
             )
             self.n1mm_scoreport.setText(str(self.preference.get("n1mm_scoreport", "")))
+            self.usetallies_checkbox.setChecked(bool(self.preference.get("usetallies")))
 
     def save_changes(self):
         """
@@ -95,6 +102,8 @@ class Settings(QtWidgets.QDialog):
         self.preference["useqrz"] = self.useqrz_radioButton.isChecked()
         self.preference["usehamdb"] = self.usehamdb_radioButton.isChecked()
         self.preference["usehamqth"] = self.usehamqth_radioButton.isChecked()
+        self.preference["uselocaldb"] = self.uselocaldb_radioButton.isChecked()
+        self.preference["localdb"] = self.localdb_field.text()
         self.preference["lookupusername"] = self.lookup_user_name_field.text()
         self.preference["lookuppassword"] = self.lookup_password_field.text()
         self.preference["cloudlog"] = self.usecloudlog_checkBox.isChecked()
@@ -128,6 +137,7 @@ class Settings(QtWidgets.QDialog):
         self.preference["n1mm_contactport"] = self.n1mm_contactport.text()
         self.preference["n1mm_lookupport"] = self.n1mm_lookupport.text()
         self.preference["n1mm_scoreport"] = self.n1mm_scoreport.text()
+        self.preference["usetallies"] = self.usetallies_checkbox.isChecked()
 
         try:
             self.logger.info("save_changes:")
@@ -0,0 +1,168 @@
+"""Super check partial index over MASTER.SCP"""
+
+import logging
+from bisect import bisect_left, insort
+from heapq import nsmallest
+
+
+class SuperCheck:
+    """
+    Answers super check partial queries against the known contesters list.
+
+    The calls are kept in one sorted list, so every call starting with a
+    partial sits in a single run that two binary searches can find.
+
+    Each call is also filed under every three character piece of it, so a
+    partial found anywhere in a call only has to be checked against the
+    calls sharing all of its trigrams.
+
+    A second sorted list holds the calls spelled backwards, so calls ending
+    in a given suffix are a single run too. A call one edit away from a
+    partial must share either its first half or its second half, so those
+    two runs are all the N+1 suggestions ever have to look at.
+    """
+
+    gram_size = 3
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("__name__")
+        self.calls = []
+        self.backwards = []
+        self.grams = {}
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def load(self, path: str) -> None:
+        """Reads a MASTER.SCP file, skipping the # comment lines."""
+        with open(path, "r", encoding="utf-8") as file_descriptor:
+            self.set_calls(
+                line.strip()
+                for line in file_descriptor
+                if line.strip() and not line.startswith("#")
+            )
+        self.logger.debug("SuperCheck: loaded %s calls", len(self.calls))
+
+    def set_calls(self, calls) -> None:
+        """Replaces the indexed calls."""
+        self.calls = sorted({call.upper() for call in calls})
+        self.backwards = sorted(call[::-1] for call in self.calls)
+        self.grams = {}
+        for call in self.calls:
+            self.index_grams(call)
+
+    def add_calls(self, calls) -> None:
+        """Adds calls, such as the ones in the log, that aren't indexed yet."""
+        for call in calls:
+            call = call.upper()
+            start = bisect_left(self.calls, call)
+            if start < len(self.calls) and self.calls[start] == call:
+                continue
+            self.calls.insert(start, call)
+            insort(self.backwards, call[::-1])
+            self.index_grams(call)
+
+    def index_grams(self, call: str) -> None:
+        """Files call under each of its trigrams."""
+        for gram in self.split_grams(call):
+            self.grams.setdefault(gram, set()).add(call)
+
+    def split_grams(self, text: str) -> set:
+        """Returns the set of trigrams in text."""
+        size = self.gram_size
+        return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+    @staticmethod
+    def run_of(calls: list, partial: str) -> tuple:
+        """Returns the (start, end) slice of a sorted list beginning with partial."""
+        start = bisect_left(calls, partial)
+        end = bisect_left(calls, partial + "\uffff", start)
+        return start, end
+
+    def prefix_range(self, partial: str) -> tuple:
+        """Returns the (start, end) slice of calls beginning with partial."""
+        return self.run_of(self.calls, partial.upper())
+
+    def prefix(self, partial: str, limit: int = 100) -> list:
+        """
+        Returns up to limit calls beginning with partial.
+        An exact match comes first, then shorter calls before longer ones.
+        """
+        start, end = self.prefix_range(partial)
+        matches = self.calls[start:end]
+        matches.sort(key=len)
+        return matches[:limit]
+
+    def search(self, partial: str, limit: int = 100, logged=()) -> list:
+        """
+        Returns up to limit calls containing partial anywhere.
+        Calls in logged come first, then calls starting with partial,
+        then shorter calls before longer ones.
+        """
+        partial = partial.upper()
+        if len(partial) < self.gram_size:
+            return self.prefix(partial, limit)
+        postings = sorted(
+            (self.grams.get(gram, ()) for gram in self.split_grams(partial)), key=len
+        )
+        if not postings[0]:
+            return []
+        matches = postings[0].intersection(*postings[1:])
+        if len(partial) > self.gram_size:
+            matches = [call for call in matches if partial in call]
+        return nsmallest(
+            limit,
+            matches,
+            key=lambda call: (
+                call not in logged,
+                not call.startswith(partial),
+                len(call),
+                call,
+            ),
+        )
+
+    @staticmethod
+    def one_edit(first: str, second: str) -> bool:
+        """
+        Returns True if the two different calls are one substituted,
+        added or dropped character apart.
+        """
+        if len(first) > len(second):
+            first, second = second, first
+        if len(second) - len(first) > 1:
+            return False
+        i = 0
+        while i < len(first) and first[i] == second[i]:
+            i += 1
+        if len(first) == len(second):
+            return first[i + 1 :] == second[i + 1 :]
+        return first[i:] == second[i + 1 :]
+
+    def near(self, call: str, limit: int = 20, logged=()) -> list:
+        """
+        Returns up to limit N+1 suggestions, the calls one edit away from call.
+        Calls in logged come first, then same length calls, then the rest.
+        """
+        call = call.upper()
+        if len(call) < 4:
+            return []
+        half = len(call) // 2
+        start, end = self.run_of(self.calls, call[:half])
+        candidates = set(self.calls[start:end])
+        start, end = self.run_of(self.backwards, call[half:][::-1])
+        candidates.update(backwards[::-1] for backwards in self.backwards[start:end])
+        candidates.discard(call)
+        matches = [
+            candidate
+            for candidate in candidates
+            if abs(len(candidate) - len(call)) < 2 and self.one_edit(call, candidate)
+        ]
+        return nsmallest(
+            limit,
+            matches,
+            key=lambda candidate: (
+                candidate not in logged,
+                len(candidate) != len(call),
+                candidate,
+            ),
+        )
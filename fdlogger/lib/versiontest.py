@@ -2,6 +2,8 @@
 import xmltodict
 import requests
 
+from .http_client import http_session
+
 
 class VersionTest:
     """Tests if version is current to PyPI packaged version."""
@@ -25,7 +27,7 @@ class VersionTest:
         Returns True if Newer version exists.
         """
         try:
-            request = requests.get(self.rss_feed, timeout=15.0)
+            request = http_session().get(self.rss_feed, timeout=15.0)
         except requests.RequestException:
             return False
 
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Compare polling flrig one call at a time with CAT.get_status()"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+import xmlrpc.client
+from pathlib import Path
+
+from fake_flrig import make_server
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from fdlogger.lib.cat_interface import CAT
+
+parser = argparse.ArgumentParser(description="Time flrig status polls.")
+parser.add_argument("-n", "--count", type=int, default=50, help="Polls per run")
+parser.add_argument(
+    "-l", "--latency", type=float, default=0.01, help="Simulated seconds per request"
+)
+parser.add_argument(
+    "-p",
+    "--port",
+    type=int,
+    default=0,
+    help="Poll a real flrig on this port instead of the stand in",
+)
+args = parser.parse_args()
+
+
+def timed(poll) -> list:
+    """Returns the seconds each of count polls took."""
+    timings = []
+    for _ in range(args.count):
+        start = time.perf_counter()
+        poll()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(title: str, timings: list) -> None:
+    """Prints a summary of the timings."""
+    print(
+        f"{title:<22} median {statistics.median(timings) * 1000:7.1f} ms"
+        f"  mean {statistics.mean(timings) * 1000:7.1f} ms"
+    )
+
+
+port = args.port
+if not port:
+    server = make_server("127.0.0.1", 0, args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+proxy = xmlrpc.client.ServerProxy(f"http://127.0.0.1:{port}")
+report(
+    "vfo, mode, ptt calls",
+    timed(lambda: (proxy.rig.get_vfo(), proxy.rig.get_mode(), proxy.rig.get_ptt())),
+)
+cat = CAT("flrig", "127.0.0.1", port)
+report("get_status multicall", timed(cat.get_status))
+print(cat.get_status())
+for name, (calls, mean, worst) in cat.latency_report().items():
+    print(
+        f"{name:<22} {calls:4} calls  mean {mean * 1000:6.1f} ms  worst {worst * 1000:6.1f} ms"
+    )
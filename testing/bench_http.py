@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Compare a new connection per request with the shared keep-alive session"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from fdlogger.lib.http_client import make_session
+
+parser = argparse.ArgumentParser(description="Time HTTP requests to a callbook.")
+parser.add_argument(
+    "-u",
+    "--url",
+    type=str,
+    default="https://api.hamdb.org/K6GTE/xml/wfd_logger",
+    help="URL to fetch",
+)
+parser.add_argument("-n", "--count", type=int, default=20, help="Requests per run")
+parser.add_argument(
+    "-l",
+    "--local",
+    action="store_true",
+    help="Use a local test server with a simulated round trip time instead",
+)
+parser.add_argument(
+    "-r", "--rtt", type=float, default=0.1, help="Simulated round trip, seconds"
+)
+args = parser.parse_args()
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers every GET after one simulated round trip."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Reply with a tiny body."""
+        time.sleep(args.rtt)
+        body = b"<hamdb><messages><status>OK</status></messages></hamdb>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        """Keep quiet."""
+
+
+class SlowServer(ThreadingHTTPServer):
+    """Charges a round trip for every new connection, like a TCP handshake would."""
+
+    daemon_threads = True
+
+    def get_request(self):
+        time.sleep(args.rtt)
+        return super().get_request()
+
+
+def timed(fetch) -> list:
+    """Returns the seconds each of count calls to fetch took."""
+    timings = []
+    for _ in range(args.count):
+        start = time.perf_counter()
+        fetch(url).raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(title: str, timings: list) -> None:
+    """Prints a summary of the timings."""
+    print(
+        f"{title:<26} median {statistics.median(timings) * 1000:7.1f} ms"
+        f"  mean {statistics.mean(timings) * 1000:7.1f} ms"
+        f"  first {timings[0] * 1000:7.1f} ms"
+    )
+
+
+url = args.url
+if args.local:
+    server = SlowServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+print(f"{args.count} requests to {url}")
+new_connections = timed(lambda target: requests.get(target, timeout=10.0))
+report("requests.get", new_connections)
+session = make_session()
+keep_alive = timed(session.get)
+report("shared session", keep_alive)
+saved = statistics.median(new_connections) - statistics.median(keep_alive[1:])
+print(f"saved per request            {saved * 1000:7.1f} ms")
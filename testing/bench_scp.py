@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Time super check partial lookups against MASTER.SCP"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fdlogger.lib.super_check import SuperCheck  # pylint: disable=wrong-import-position
+
+SCP_PATH = Path(__file__).resolve().parent.parent / "fdlogger" / "data" / "MASTER.SCP"
+ROUNDS = 20
+
+scp = SuperCheck()
+start = time.perf_counter()
+scp.load(str(SCP_PATH))
+print(f"loaded {len(scp)} calls in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def bench(title, lookup, partials):
+    """Times lookup over each partial and prints a summary."""
+    timings = []
+    for partial in partials:
+        began = time.perf_counter()
+        for _ in range(ROUNDS):
+            lookup(partial)
+        timings.append(((time.perf_counter() - began) / ROUNDS, partial))
+    timings.sort()
+    average = sum(timing for timing, _ in timings) / len(timings)
+    print(f"{title}: {len(partials)} partials")
+    print(f"  average {average * 1e6:.1f} us")
+    print(f"  median  {timings[len(timings) // 2][0] * 1e6:.1f} us")
+    print(f"  worst   {timings[-1][0] * 1e6:.1f} us ({timings[-1][1]})")
+
+
+bench(
+    "prefix, 3 to 5 characters",
+    scp.prefix,
+    sorted({call[:length] for call in scp.calls for length in (3, 4, 5)}),
+)
+bench(
+    "substring, 3 and 4 characters",
+    scp.search,
+    sorted(
+        {
+            call[i : i + length]
+            for call in scp.calls[::10]
+            for length in (3, 4)
+            for i in range(len(call) - length + 1)
+        }
+    ),
+)
+bench(
+    "N+1, one character changed",
+    scp.near,
+    sorted({call[:-1] + "Q" for call in scp.calls[::10] if len(call) > 3}),
+)
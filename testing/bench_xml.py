@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Compare xmltodict with xml_fields on the callbook replies in lookup.py"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import xmltodict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from fdlogger.lib.lookup import HamDBlookup, QRZlookup, xml_fields
+
+ROUNDS = 5000
+
+
+def sample(docstring: str, root: str) -> str:
+    """Cuts the example reply out of a docstring."""
+    start = docstring.index("<?xml")
+    end = docstring.index(f"</{root}>") + len(root) + 3
+    return "\n".join(line.strip() for line in docstring[start:end].splitlines())
+
+
+def old_qrz(text: str) -> tuple:
+    """What QRZlookup.parse_lookup used to do."""
+    root = xmltodict.parse(text).get("QRZDatabase")
+    callsign = root.get("Callsign") or {}
+    session = root.get("Session") or {}
+    return (
+        callsign.get("grid"),
+        callsign.get("fname"),
+        callsign.get("name"),
+        callsign.get("nickname"),
+        session.get("Key"),
+    )
+
+
+def new_qrz(text: str) -> tuple:
+    """The same fields through xml_fields."""
+    fields = xml_fields(text, QRZFIELDS)
+    callsign = fields.get("callsign", {})
+    session = fields.get("session", {})
+    return (
+        callsign.get("grid"),
+        callsign.get("fname"),
+        callsign.get("name"),
+        callsign.get("nickname"),
+        session.get("key"),
+    )
+
+
+def old_hamdb(text: str) -> tuple:
+    """What HamDBlookup.lookup used to do."""
+    root = xmltodict.parse(text).get("hamdb")
+    callsign = root.get("callsign") or {}
+    return (
+        callsign.get("grid"),
+        callsign.get("fname"),
+        callsign.get("name"),
+        root.get("messages").get("status"),
+    )
+
+
+def new_hamdb(text: str) -> tuple:
+    """The same fields through xml_fields."""
+    fields = xml_fields(text, HAMDBFIELDS)
+    callsign = fields.get("callsign", {})
+    return (
+        callsign.get("grid"),
+        callsign.get("fname"),
+        callsign.get("name"),
+        fields.get("messages").get("status"),
+    )
+
+
+QRZFIELDS = {
+    "callsign": {"call", "grid", "fname", "name", "nickname"},
+    "session": {"key", "subexp", "error", "message"},
+}
+HAMDBFIELDS = {
+    "callsign": {"call", "grid", "fname", "name", "nickname"},
+    "messages": {"status"},
+}
+
+payloads = (
+    (
+        "QRZ lookup",
+        sample(QRZlookup.parse_lookup.__doc__, "QRZDatabase"),
+        old_qrz,
+        new_qrz,
+    ),
+    (
+        "QRZ session",
+        sample(QRZlookup.getsession.__doc__, "QRZDatabase"),
+        old_qrz,
+        new_qrz,
+    ),
+    (
+        "HamDB lookup",
+        sample(HamDBlookup.lookup.__doc__, "hamdb"),
+        old_hamdb,
+        new_hamdb,
+    ),
+)
+
+for title, payload, old, new in payloads:
+    assert old(payload) == new(payload), (old(payload), new(payload))
+    old_time = timeit.timeit(lambda f=old, p=payload: f(p), number=ROUNDS) / ROUNDS
+    new_time = timeit.timeit(lambda f=new, p=payload: f(p), number=ROUNDS) / ROUNDS
+    print(
+        f"{title:<14} xmltodict {old_time * 1e6:6.1f} us"
+        f"  xml_fields {new_time * 1e6:6.1f} us"
+        f"  {old_time / new_time:4.1f}x"
+    )
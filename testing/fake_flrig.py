@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+A stand in for flrig's XML-RPC server, so the CAT code can be tried and
+timed without a radio.
+
+Point the logger's flrig settings at it, 127.0.0.1 and port 12345 by
+default. Every request waits --latency seconds before it's answered, like
+flrig on a busy or distant machine would.
+"""
+
+import argparse
+import time
+from socketserver import ThreadingMixIn
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+
+class KeepAliveHandler(SimpleXMLRPCRequestHandler):
+    """Holds the connection open between calls, as flrig does."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Answers after the server's latency."""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        super().do_POST()
+
+    def log_message(self, *_):
+        """Keep quiet."""
+
+
+class FakeFlrig(ThreadingMixIn, SimpleXMLRPCServer):
+    """One thread per connection, so kept alive connections don't block."""
+
+    daemon_threads = True
+
+    def __init__(self, address, rig, latency: float = 0.0) -> None:
+        super().__init__(address, requestHandler=KeepAliveHandler, logRequests=False)
+        self.rig = rig
+        self.latency = latency
+
+
+class FakeRig:
+    """The rig.* methods flrig offers that the logger uses."""
+
+    def __init__(self) -> None:
+        self.vfo = "14030000"
+        self.mode = "CW"
+        self.bandwidth = ["500", ""]
+        self.ptt = 0
+        self.power = 100
+
+    def get_vfo(self) -> str:
+        """rig.get_vfo"""
+        return self.vfo
+
+    def get_mode(self) -> str:
+        """rig.get_mode"""
+        return self.mode
+
+    def get_bw(self) -> list:
+        """rig.get_bw"""
+        return self.bandwidth
+
+    def get_ptt(self) -> int:
+        """rig.get_ptt"""
+        return self.ptt
+
+    def get_power(self) -> int:
+        """rig.get_power"""
+        return self.power
+
+    def set_frequency(self, freq: float) -> float:
+        """rig.set_frequency"""
+        self.vfo = str(int(freq))
+        return freq
+
+    def set_mode(self, mode: str) -> int:
+        """rig.set_mode"""
+        self.mode = mode
+        return 0
+
+    def set_power(self, power: int) -> int:
+        """rig.set_power"""
+        self.power = int(power)
+        return 0
+
+    def set_ptt(self, ptt: int) -> int:
+        """rig.set_ptt"""
+        self.ptt = int(ptt)
+        return 0
+
+
+def make_server(host: str, port: int, latency: float = 0.0) -> FakeFlrig:
+    """Returns a fake flrig server, ready for serve_forever()."""
+    rig = FakeRig()
+    server = FakeFlrig((host, port), rig, latency)
+    for name in (
+        "get_vfo",
+        "get_mode",
+        "get_bw",
+        "get_ptt",
+        "get_power",
+        "set_frequency",
+        "set_mode",
+        "set_power",
+        "set_ptt",
+    ):
+        server.register_function(getattr(rig, name), f"rig.{name}")
+    server.register_multicall_functions()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pretend to be flrig.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=12345)
+    parser.add_argument(
+        "-l", "--latency", type=float, default=0.0, help="Seconds per request"
+    )
+    args = parser.parse_args()
+    print(f"fake flrig on {args.host}:{args.port}")
+    make_server(args.host, args.port, args.latency).serve_forever()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+A stand in for hamlib's rigctld, so the CAT code can be tried without a
+radio, including on a bad day.
+
+Point the logger's rigctld settings at it, 127.0.0.1 and port 4532 by
+default. --latency holds every answer back, --fragment sends answers a few
+bytes at a time, and --garble mixes up the odd reply to see the client
+notice and reconnect. Both the short (f, M) and long (\\get_freq,
+\\set_mode) command names are understood, in plain or extended (+) mode.
+"""
+
+import argparse
+import random
+import socketserver
+import time
+
+SHORT = {
+    "f": "get_freq",
+    "F": "set_freq",
+    "m": "get_mode",
+    "M": "set_mode",
+    "t": "get_ptt",
+    "T": "set_ptt",
+    "l": "get_level",
+    "L": "set_level",
+    "b": "send_morse",
+}
+
+
+class FakeRig:
+    """The radio state behind the fake rigctld."""
+
+    def __init__(self) -> None:
+        self.freq = "14030000"
+        self.mode = "CW"
+        self.passband = "500"
+        self.ptt = "0"
+        self.levels = {"RFPOWER": "1.000000"}
+
+    def answer(self, name: str, arguments: list) -> tuple:
+        """Returns ([(label, value), ...], code) for one command."""
+        if name and name.startswith("get_"):
+            return self.read(name, arguments)
+        return [], self.write(name, arguments)
+
+    def read(self, name: str, arguments: list) -> tuple:
+        """Answers a get_ command with ([(label, value), ...], code)."""
+        if name == "get_freq":
+            return [("Frequency", self.freq)], 0
+        if name == "get_mode":
+            return [("Mode", self.mode), ("Passband", self.passband)], 0
+        if name == "get_ptt":
+            return [("PTT", self.ptt)], 0
+        if name == "get_level" and arguments and arguments[0] in self.levels:
+            return [(arguments[0], self.levels[arguments[0]])], 0
+        return [], -11
+
+    def write(self, name: str, arguments: list) -> int:
+        """Carries out a set_ or send_ command, returning its RPRT code."""
+        if name == "set_freq" and arguments:
+            self.freq = str(int(float(arguments[0])))
+        elif name == "set_mode" and arguments:
+            if arguments[0] not in (
+                "CW",
+                "CWR",
+                "USB",
+                "LSB",
+                "AM",
+                "FM",
+                "RTTY",
+                "PKTUSB",
+            ):
+                return -1
+            self.mode = arguments[0]
+        elif name == "set_ptt" and arguments:
+            self.ptt = arguments[0]
+        elif name == "set_level" and len(arguments) > 1:
+            self.levels[arguments[0]] = arguments[1]
+        elif name != "send_morse":
+            return -11
+        return 0
+
+
+class RigctldHandler(socketserver.StreamRequestHandler):
+    """Answers rigctld commands, one per line."""
+
+    def handle(self):
+        try:
+            self.answer_lines()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def answer_lines(self) -> None:
+        """Reads commands until the client hangs up."""
+        options = self.server.options
+        for raw in self.rfile:
+            line = raw.decode(errors="replace").strip()
+            if not line:
+                continue
+            extended = line.startswith("+")
+            line = line.lstrip("+")
+            command, *arguments = line.split()
+            name = command[1:] if command.startswith("\\") else SHORT.get(command)
+            values, code = self.server.rig.answer(name, arguments)
+            if extended:
+                header = f"{name}: {' '.join(arguments)}".strip()
+                if options.garble and random.random() < options.garble:
+                    header = "get_vfo:"
+                reply = f"{header}\n"
+                reply += "".join(f"{label}: {value}\n" for label, value in values)
+                reply += f"RPRT {code}\n"
+            elif values:
+                reply = "".join(f"{value}\n" for _, value in values)
+            else:
+                reply = f"RPRT {code}\n"
+            if options.latency:
+                time.sleep(options.latency)
+            self.send(reply.encode())
+
+    def send(self, data: bytes) -> None:
+        """Sends data, in random little pieces if asked to."""
+        size = self.server.options.fragment
+        while data:
+            cut = random.randint(1, size) if size else len(data)
+            self.wfile.write(data[:cut])
+            self.wfile.flush()
+            data = data[cut:]
+            if size:
+                time.sleep(0.001)
+
+
+class FakeRigctld(socketserver.ThreadingTCPServer):
+    """One thread per connection, all sharing one rig."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, options) -> None:
+        super().__init__(address, RigctldHandler)
+        self.options = options
+        self.rig = FakeRig()
+
+
+def make_server(
+    host: str, port: int, latency: float = 0.0, fragment: int = 0, garble: float = 0.0
+) -> FakeRigctld:
+    """Returns a fake rigctld, ready for serve_forever()."""
+    return FakeRigctld(
+        (host, port),
+        argparse.Namespace(latency=latency, fragment=fragment, garble=garble),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pretend to be rigctld.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=4532)
+    parser.add_argument(
+        "-l", "--latency", type=float, default=0.0, help="Seconds before each answer"
+    )
+    parser.add_argument(
+        "-f",
+        "--fragment",
+        type=int,
+        default=0,
+        help="Send answers in random pieces of at most this many bytes",
+    )
+    parser.add_argument(
+        "-g",
+        "--garble",
+        type=float,
+        default=0.0,
+        help="Chance of answering an extended command with the wrong header",
+    )
+    args = parser.parse_args()
+    print(f"fake rigctld on {args.host}:{args.port}")
+    make_server(
+        args.host, args.port, args.latency, args.fragment, args.garble
+    ).serve_forever()